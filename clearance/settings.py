@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -41,10 +42,12 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.profiling.ProfilingMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.roles.RoleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -62,6 +65,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'core.context_processors.academic_term',
             ],
         },
     },
@@ -73,14 +77,135 @@ WSGI_APPLICATION = 'clearance.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+#
+# CLEARANCE_DB_PROFILE selects the database:
+#   sqlite   - local development and CI (default)
+#   postgres - production, configured through the POSTGRES_* variables
+
+DATABASE_PROFILE = os.environ.get('CLEARANCE_DB_PROFILE', 'sqlite')
+
+if DATABASE_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('POSTGRES_DB', 'clearance'),
+            'USER': os.environ.get('POSTGRES_USER', 'clearance'),
+            'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+            'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+            'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+            # Persistent connections, checked before reuse
+            'CONN_MAX_AGE': int(os.environ.get('POSTGRES_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get('POSTGRES_POOL', '').lower() in ('1', 'true', 'yes'):
+        # psycopg3 connection pool (needs psycopg-pool). Django does not allow
+        # persistent connections together with pooling.
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get('POSTGRES_POOL_MIN_SIZE', '2')),
+            'max_size': int(os.environ.get('POSTGRES_POOL_MAX_SIZE', '10')),
+            'timeout': int(os.environ.get('POSTGRES_POOL_TIMEOUT', '10')),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # WAL lets readers run alongside the single writer, and
+                # IMMEDIATE transactions wait for the write lock up front
+                # instead of failing with "database is locked" mid-transaction
+                'transaction_mode': 'IMMEDIATE',
+                'init_command': (
+                    'PRAGMA journal_mode=WAL;'
+                    'PRAGMA synchronous=NORMAL;'
+                    'PRAGMA busy_timeout=5000;'
+                ),
+            },
+        }
+    }
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+#
+# CLEARANCE_CACHE selects the backend of the default cache, used through
+# core.cache:
+#   locmem - memory of each worker process (default)
+#   file   - files under cache/, shared by the worker processes of a host
+#   db     - a database table shared by every host, created by
+#            manage.py createcachetable
+
+def cache_config(mode, name):
+    if mode == 'file':
+        return {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.path.join(BASE_DIR, 'cache', name),
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    if mode == 'db':
+        return {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': f'clearance_cache_{name}',
+            'OPTIONS': {'MAX_ENTRIES': 50000},
+        }
+    return {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': name,
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
+
+CACHE_MODE = os.environ.get('CLEARANCE_CACHE', 'locmem')
+
+CACHES = {
+    'default': cache_config(CACHE_MODE, 'default'),
+    # See CLEARANCE_SESSION_CACHE below
+    'sessions': cache_config(os.environ.get('CLEARANCE_SESSION_CACHE', 'file'), 'sessions'),
 }
 
 
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+#
+# CLEARANCE_SESSION_MODE selects where sessions live:
+#   db             - the database on every request (default)
+#   cached_db      - the database, read through the 'sessions' cache, so
+#                    only logins and session changes write to the database
+#   signed_cookies - the client's cookie, no server side storage. Sessions
+#                    cannot be revoked server side before they expire.
+#
+# CLEARANCE_SESSION_CACHE picks the cache behind cached_db, as CLEARANCE_CACHE
+# does for the default cache. 'file' (default) is shared by every worker
+# process of the host, 'locmem' only suits a single process.
+
+SESSION_MODE = os.environ.get('CLEARANCE_SESSION_MODE', 'db')
+SESSION_ENGINE = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}[SESSION_MODE]
+SESSION_CACHE_ALIAS = 'sessions'
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+#
+# PASSWORD_HASH_ITERATIONS tunes the PBKDF2 cost, Django's default when
+# unset. Passwords are rehashed to the configured cost when users log in.
+
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '0')) or None
+
+PASSWORD_HASHERS = [
+    'core.hashers.TunablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -121,7 +246,6 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-import os
 
 INSTALLED_APPS.append('core')
 
@@ -139,3 +263,9 @@ TEMPLATES[0]['DIRS'].append(os.path.join(BASE_DIR, 'templates'))
 LOGIN_URL='login'
 LOGIN_REDIRECT_URL = 'home'
 LOGOUT_REDIRECT_URL = '/'  # Redirects to home page after logout
+
+# Request profiling, see core/profiling.py. The fraction of requests sampled,
+# 0 turns it off. Results are served at /dashboard/admin/profiling/.
+PROFILING_SAMPLE_RATE = float(os.environ.get('PROFILING_SAMPLE_RATE', '0'))
+# Adds a Server-Timing header to sampled responses
+PROFILING_SERVER_TIMING = os.environ.get('PROFILING_SERVER_TIMING', '') == '1'
@@ -1,5 +1,7 @@
 from django.contrib import admin
-from core.models import Office, Staff, Student, ClearanceRequest, Clearance
+from core.models import AcademicTerm, Office, Staff, Student, ClearanceRequest, Clearance, PermitUnlock
+from core.terms import get_current_term
+
 @admin.register(Office)
 class OfficeAdmin(admin.ModelAdmin):
     list_display = ('name', 'description', 'created_at')
@@ -19,10 +21,28 @@ class StudentAdmin(admin.ModelAdmin):
     search_fields = ('student_id', 'user__username', 'user__first_name', 'user__last_name')
     raw_id_fields = ('user',)
 
+    actions = ['open_current_semester']
+
     def get_full_name(self, obj):
         return obj.user.get_full_name()
     get_full_name.short_description = 'Full Name'
 
+    def open_current_semester(self, request, queryset):
+        school_year, semester = get_current_term()
+        result = Student.open_semester(school_year, semester, students=queryset)
+        self.message_user(
+            request,
+            f"Opened {school_year} {semester} for {result['students']} students in {result['elapsed']:.2f}s: "
+            f"{result['clearances_created']} clearances and {result['requests_created']} requests created."
+        )
+    open_current_semester.short_description = "Create clearance requests for the current semester"
+
+@admin.register(AcademicTerm)
+class AcademicTermAdmin(admin.ModelAdmin):
+    list_display = ('school_year', 'semester', 'start_date', 'end_date', 'is_current')
+    list_filter = ('semester', 'is_current')
+    ordering = ('-start_date',)
+
 @admin.register(ClearanceRequest)
 class ClearanceRequestAdmin(admin.ModelAdmin):
     list_display = ('student', 'office', 'status', 'reviewed_by', 'request_date', 'reviewed_date')
@@ -44,9 +64,17 @@ class ClearanceAdmin(admin.ModelAdmin):
     actions = ['approve_program_chair']
 
     def approve_program_chair(self, request, queryset):
-        for clearance in queryset:
-            if clearance.is_cleared:
-                clearance.program_chair_approved = True
-                clearance.save()
+        result = Clearance.unlock_permits(queryset, unlocked_by=request.user)
+        self.message_user(
+            request,
+            f"Unlocked {result['unlocked']} permits ({result['already_unlocked']} already unlocked, "
+            f"{result['not_cleared']} not yet cleared)."
+        )
     approve_program_chair.short_description = "Approve selected clearances by program chair"
 
+@admin.register(PermitUnlock)
+class PermitUnlockAdmin(admin.ModelAdmin):
+    list_display = ('clearance', 'unlocked_by', 'unlocked_at')
+    search_fields = ('clearance__student__student_id', 'unlocked_by__username')
+    raw_id_fields = ('clearance', 'unlocked_by')
+    date_hierarchy = 'unlocked_at'
@@ -1,6 +1,11 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from core.search import ensure_search_index
+        post_migrate.connect(ensure_search_index, sender=self, dispatch_uid='core_search_index')
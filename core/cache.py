@@ -0,0 +1,111 @@
+"""
+Versioned cache keys on top of the default cache.
+
+Cached values are tagged with scopes: a dean, office, student or term,
+the global scope touched when accounts, offices or semesters are added or
+removed, the statistics scope of the school-wide clearance counts and the
+reference scope of the form dropdown lists. Each scope has a version number
+kept in the cache, and a key embeds the versions of its scopes. Bumping a
+scope therefore orphans every entry tagged with it without having to know
+their keys; orphaned entries simply expire.
+
+    stats = get_or_set('program_chair_stats', [dean_scope(dean.pk), term_scope(year, semester)],
+                       compute_stats, timeout=60)
+    invalidate_on_commit(term_scope(year, semester))
+"""
+import time
+
+from django.core.cache import caches
+from django.db import transaction
+
+CACHE_ALIAS = 'default'
+
+DEAN = 'dean'
+OFFICE = 'office'
+STUDENT = 'student'
+TERM = 'term'
+GLOBAL_SCOPE = 'global'
+# School-wide clearance and request counts, touched by every review
+STATS_SCOPE = 'stats'
+# Deans, courses, offices and the program chair and dormitory owner lists
+REFERENCE_SCOPE = 'reference'
+
+_missing = object()
+
+
+def get_cache():
+    return caches[CACHE_ALIAS]
+
+
+def dean_scope(dean_id):
+    return f'{DEAN}:{dean_id}'
+
+
+def office_scope(office_id):
+    return f'{OFFICE}:{office_id}'
+
+
+def student_scope(student_id):
+    return f'{STUDENT}:{student_id}'
+
+
+def term_scope(school_year, semester):
+    return f'{TERM}:{school_year}:{semester}'
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def _new_version():
+    # Time based, so a version dropped by the cache never restarts at a
+    # number that older entries still carry
+    return time.time_ns() // 1000
+
+
+def get_versions(scopes):
+    """Returns the current version of each scope, in one cache round trip."""
+    cache = get_cache()
+    keys = {_version_key(scope): scope for scope in scopes}
+    versions = cache.get_many(list(keys))
+    missing = {key: _new_version() for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, timeout=None)
+        versions.update(missing)
+    return {scope: versions[key] for key, scope in keys.items()}
+
+
+def make_key(name, scopes):
+    """Builds the cache key of name under the current versions of its scopes."""
+    versions = get_versions(scopes)
+    return ':'.join([name] + [f'{scope}@{versions[scope]}' for scope in scopes])
+
+
+def get_or_set(name, scopes, compute, timeout):
+    """Returns the cached value of name for its scopes, computing and storing it on a miss."""
+    cache = get_cache()
+    key = make_key(name, scopes)
+    value = cache.get(key, _missing)
+    if value is _missing:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def invalidate(*scopes):
+    """Bumps the version of each scope, orphaning the entries tagged with it."""
+    cache = get_cache()
+    for scope in set(scopes):
+        try:
+            cache.incr(_version_key(scope))
+        except ValueError:
+            cache.set(_version_key(scope), _new_version(), timeout=None)
+
+
+def invalidate_on_commit(*scopes):
+    """
+    Bumps the scopes once the current transaction commits, at once outside
+    of one. Bumping before the commit would let a concurrent request cache
+    the old rows under the new versions.
+    """
+    transaction.on_commit(lambda: invalidate(*scopes))
@@ -0,0 +1,12 @@
+from core.models import SEMESTER_CHOICES
+from core.terms import get_current_term
+
+
+def academic_term(request):
+    """Adds the current school year and semester to every template context."""
+    school_year, semester = get_current_term()
+    return {
+        'current_school_year': school_year,
+        'current_semester': semester,
+        'current_semester_display': dict(SEMESTER_CHOICES).get(semester, semester),
+    }
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 with the iteration count taken from
+    PASSWORD_HASH_ITERATIONS, Django's default when unset. It keeps the
+    pbkdf2_sha256 algorithm name, so existing hashes verify unchanged and are
+    rehashed to the configured cost the next time their user logs in.
+    """
+
+    @property
+    def iterations(self):
+        return getattr(settings, 'PASSWORD_HASH_ITERATIONS', None) or PBKDF2PasswordHasher.iterations
@@ -0,0 +1,91 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+from core.models import ClearanceRequest
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the ClearanceRequest access patterns with and without the composite indexes. '
+        'The indexes are dropped inside a transaction that is rolled back afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=20, help="Runs per query, the median is reported")
+        parser.add_argument('--explain', action='store_true', help="Print the query plans")
+
+    def handle(self, *args, **kwargs):
+        if not connection.features.can_rollback_ddl:
+            raise CommandError("This database cannot roll back DROP INDEX, refusing to run.")
+
+        busiest_office = ClearanceRequest.objects.order_by().values('office').annotate(
+            total=Count('pk')
+        ).order_by('-total').first()
+        sample_request = ClearanceRequest.objects.order_by('pk').first()
+        if busiest_office is None or sample_request is None:
+            raise CommandError("No clearance requests found. Seed the database first.")
+
+        self.stdout.write(f"Benchmarking on {ClearanceRequest.objects.count()} clearance requests")
+        queries = self.build_queries(busiest_office['office'], sample_request)
+
+        with_indexes = self.run_queries(queries, kwargs['repeat'], kwargs['explain'], 1)
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for index in ClearanceRequest._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+            self.stdout.write(self.style.WARNING("\nComposite indexes dropped (will be rolled back)"))
+            without_indexes = self.run_queries(queries, kwargs['repeat'], kwargs['explain'], 2)
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS("\nMedian latency (ms)"))
+        self.stdout.write(f"{'query':<24}{'without':>12}{'with':>12}")
+        for name in queries:
+            self.stdout.write(f"{name:<24}{without_indexes[name]:>12.2f}{with_indexes[name]:>12.2f}")
+
+    def build_queries(self, office_id, sample_request):
+        today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+        return {
+            'pending_queue': ClearanceRequest.objects.filter(
+                office_id=office_id, status='pending'
+            ).order_by('request_date', 'id')[:50],
+            'history': ClearanceRequest.objects.filter(
+                office_id=office_id, status__in=['approved', 'denied']
+            ).order_by('-reviewed_date')[:20],
+            'approved_today': ClearanceRequest.objects.filter(
+                office_id=office_id,
+                status='approved',
+                reviewed_date__gte=today_start,
+                reviewed_date__lt=today_start + timedelta(days=1)
+            ).order_by().values('pk'),
+            'recent_requests': ClearanceRequest.objects.filter(
+                office_id=office_id
+            ).order_by('-request_date')[:10],
+            'student_term_status': ClearanceRequest.objects.filter(
+                student_id=sample_request.student_id,
+                school_year=sample_request.school_year,
+                semester=sample_request.semester,
+                status='pending'
+            ).order_by().values('pk')[:1],
+        }
+
+    def run_queries(self, queries, repeat, explain, pass_number):
+        results = {}
+        for name, queryset in queries.items():
+            # Distinct SQL text per pass, so that a driver-side statement cache
+            # cannot reuse a plan compiled before the indexes were dropped
+            queryset = queryset.annotate(benchmark_pass=RawSQL(str(pass_number), []))
+            if explain:
+                self.stdout.write(f"\n{name}:\n{queryset.explain()}")
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append((time.perf_counter() - started) * 1000)
+            results[name] = statistics.median(timings)
+        return results
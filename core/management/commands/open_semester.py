@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from core.models import Student, SEMESTER_CHOICES
+from core.terms import get_current_term
+
+
+class Command(BaseCommand):
+    help = 'Create clearance records and clearance requests for every student for a semester'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school-year', help="School year, e.g. 2024-2025, defaults to the current term")
+        parser.add_argument(
+            '--semester',
+            choices=[code for code, _ in SEMESTER_CHOICES],
+            help="Semester code, defaults to the current term"
+        )
+        parser.add_argument('--chunk-size', type=int, default=1000, help="Students written per bulk insert")
+
+    def handle(self, *args, **kwargs):
+        current_school_year, current_semester = get_current_term()
+        school_year = kwargs['school_year'] or current_school_year
+        semester = kwargs['semester'] or current_semester
+
+        self.stdout.write(f"Opening {school_year} {semester} semester...")
+        result = Student.open_semester(school_year, semester, chunk_size=kwargs['chunk_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result['students']} students in {result['elapsed']:.2f}s "
+            f"({result['students_per_second']:.0f} students/s): "
+            f"{result['clearances_created']} clearances and "
+            f"{result['requests_created']} clearance requests created"
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.cache import STATS_SCOPE, invalidate_on_commit, term_scope
+from core.models import Clearance, Student, SEMESTER_CHOICES
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the denormalized clearance request counters from the clearance requests table'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--school-year', help="Only rebuild clearances for this school year")
+        parser.add_argument(
+            '--semester',
+            choices=[code for code, _ in SEMESTER_CHOICES],
+            help="Only rebuild clearances for this semester"
+        )
+
+    def handle(self, *args, **kwargs):
+        clearances = Clearance.objects.all()
+        if kwargs['school_year']:
+            clearances = clearances.filter(school_year=kwargs['school_year'])
+        if kwargs['semester']:
+            clearances = clearances.filter(semester=kwargs['semester'])
+
+        with transaction.atomic():
+            rebuilt = Clearance.rebuild_counters(clearances)
+            flagged = Clearance.update_cleared_flags(clearances)
+
+            # Queryset updates do not send post_save signals
+            Student.touch_clearances(clearances.values('student_id'))
+            invalidate_on_commit(STATS_SCOPE, *(
+                term_scope(school_year, semester) for school_year, semester in
+                clearances.order_by().values_list('school_year', 'semester').distinct()
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt counters for {rebuilt} clearances ({flagged} cleared flags changed)"
+        ))
@@ -0,0 +1,209 @@
+import json
+import os
+import statistics
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import check_password, get_hasher
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+from core.models import ClearanceRequest, ReportJob, Student
+from core.profiling import percentile
+from core.synthetic import generate_dataset
+from core.terms import clear_term_cache
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the clearance week views against a synthetic dataset in a throwaway test database. '
+        'Writes throughput and p50/p95/p99 latency per scenario as JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=2000, help="Synthetic students to generate")
+        parser.add_argument('--deans', type=int, default=4)
+        parser.add_argument('--requests', type=int, default=100, help="Requests per view scenario")
+        parser.add_argument('--report-runs', type=int, default=3, help="Report builds per report type")
+        parser.add_argument('--logins', type=int, default=50, help="Full logins through user_login")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark_results.json', help="JSON file to write, - for stdout")
+
+    def handle(self, *args, **kwargs):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with tempfile.TemporaryDirectory() as media_root, override_settings(MEDIA_ROOT=media_root):
+                results = self.run_suite(kwargs)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        output = json.dumps(results, indent=2)
+        if kwargs['output'] == '-':
+            self.stdout.write(output)
+        else:
+            with open(kwargs['output'], 'w') as f:
+                f.write(output)
+            self.stdout.write(self.style.SUCCESS(f"Results written to {kwargs['output']}"))
+
+    def run_suite(self, options):
+        cache.clear()
+        clear_term_cache()
+
+        self.stdout.write(f"Generating {options['students']} students...")
+        started = time.perf_counter()
+        dataset = generate_dataset(students=options['students'], deans=options['deans'], seed=options['seed'])
+        self.stdout.write(f"Dataset ready in {time.perf_counter() - started:.2f}s")
+
+        library_staff = next(staff for staff in dataset['staff'] if staff.office.name == 'LIBRARY')
+        program_chair = dataset['program_chairs'][0]
+        students = list(
+            Student.objects.select_related('user').order_by('pk')[:options['requests']]
+        )
+        pending_ids = list(
+            ClearanceRequest.objects.filter(office=library_staff.office, status='pending')
+            .order_by('pk').values_list('pk', flat=True)[:options['requests']]
+        )
+
+        student_clients = []
+        for student in students:
+            client = Client()
+            client.force_login(student.user)
+            student_clients.append(client)
+        staff_client = Client()
+        staff_client.force_login(library_staff.user)
+        chair_client = Client()
+        chair_client.force_login(program_chair.user)
+
+        scenarios = {}
+        password_hash = students[0].user.password
+        scenarios['password_check'] = self.measure(
+            'password_check', options['logins'],
+            lambda index: check_password(dataset['password'], password_hash)
+        )
+        scenarios['user_login'] = self.measure(
+            'user_login', options['logins'],
+            lambda index: Client().post(reverse('login'), {
+                'username': students[index % len(students)].user.username,
+                'password': dataset['password'],
+            })
+        )
+        scenarios['student_dashboard'] = self.measure(
+            'student_dashboard', options['requests'],
+            lambda index: student_clients[index % len(student_clients)].get(reverse('student_dashboard'))
+        )
+        scenarios['staff_pending_requests'] = self.measure(
+            'staff_pending_requests', options['requests'],
+            lambda index: staff_client.get(reverse('staff_pending_requests'))
+        )
+        scenarios['approve_clearance_request'] = self.measure(
+            'approve_clearance_request', len(pending_ids),
+            lambda index: staff_client.post(reverse('approve_clearance_request', args=[pending_ids[index]]))
+        )
+        scenarios['program_chair_dashboard'] = self.measure(
+            'program_chair_dashboard', options['requests'],
+            lambda index: chair_client.get(reverse('program_chair_dashboard'))
+        )
+        scenarios['generate_report'] = self.measure(
+            'generate_report', options['requests'],
+            lambda index: staff_client.post(reverse('generate_report'), {
+                'school_year': dataset['school_year'],
+                'semester': dataset['semester'],
+                'report_type': 'excel' if index % 2 else 'pdf',
+            })
+        )
+        for report_type in ('pdf', 'excel'):
+            scenarios[f'build_{report_type}_report'] = self.measure(
+                f'build_{report_type}_report',
+                options['report_runs'],
+                lambda index: self.build_report(dataset, report_type, index)
+            )
+
+        return {
+            'commit': self.get_commit(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {
+                'students': options['students'],
+                'deans': options['deans'],
+                'seed': options['seed'],
+                'clearances': dataset['opened']['clearances_created'],
+                'clearance_requests': dataset['opened']['requests_created'],
+            },
+            'auth': self.get_auth_summary(scenarios['user_login']),
+            'scenarios': scenarios,
+        }
+
+    def get_auth_summary(self, login_result):
+        # Password hashing keeps a core busy for the whole login, so logins
+        # scale with cores until the database becomes the bottleneck
+        login_ms = login_result['latency_ms']['mean']
+        cores = os.cpu_count() or 1
+        return {
+            'session_engine': settings.SESSION_ENGINE,
+            'password_hasher': get_hasher().algorithm,
+            'password_hash_iterations': getattr(get_hasher(), 'iterations', None),
+            'cpu_count': cores,
+            'estimated_login_capacity_rps': round(cores * 1000 / login_ms, 1) if login_ms else None,
+        }
+
+    def build_report(self, dataset, report_type, index):
+        job = ReportJob.objects.create(
+            school_year=dataset['school_year'],
+            semester=dataset['semester'],
+            report_type=report_type,
+            data_version=f"benchmark-{index}",
+            status='running',
+        )
+        job.run()
+        return job
+
+    def measure(self, name, count, run):
+        timings = []
+        queries = []
+        errors = 0
+        started = time.perf_counter()
+        for index in range(count):
+            with CaptureQueriesContext(connection) as context:
+                request_started = time.perf_counter()
+                result = run(index)
+                timings.append((time.perf_counter() - request_started) * 1000)
+            queries.append(len(context.captured_queries))
+            status = getattr(result, 'status_code', None)
+            if (status is not None and status >= 400) or getattr(result, 'status', None) == 'failed':
+                errors += 1
+        elapsed = time.perf_counter() - started
+
+        timings.sort()
+        result = {
+            'requests': count,
+            'errors': errors,
+            'throughput_rps': round(count / elapsed, 2) if elapsed else 0,
+            'latency_ms': {
+                'mean': round(statistics.mean(timings), 2) if timings else 0,
+                'p50': round(percentile(timings, 50), 2),
+                'p95': round(percentile(timings, 95), 2),
+                'p99': round(percentile(timings, 99), 2),
+            },
+            'queries_per_request': round(statistics.mean(queries), 1) if queries else 0,
+        }
+        self.stdout.write(
+            f"{name:<28}{result['requests']:>5} runs  p50 {result['latency_ms']['p50']:>8.2f}ms  "
+            f"p95 {result['latency_ms']['p95']:>8.2f}ms  {result['throughput_rps']:>8.2f} rps"
+        )
+        return result
+
+    def get_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.models import ReportJob
+
+
+class Command(BaseCommand):
+    help = 'Process queued report jobs, storing the generated files under MEDIA_ROOT'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Exit once the queue is empty")
+        parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds to wait when the queue is empty")
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write(self.style.SUCCESS("Report worker started"))
+        while True:
+            job = ReportJob.claim_next()
+            if job is None:
+                if kwargs['once']:
+                    break
+                time.sleep(kwargs['poll_interval'])
+                continue
+
+            self.stdout.write(f"Building {job}...")
+            job.run()
+            if job.status == 'done':
+                elapsed = (job.finished_at - job.started_at).total_seconds()
+                self.stdout.write(self.style.SUCCESS(f"Finished job {job.pk} in {elapsed:.2f}s: {job.file.name}"))
+            else:
+                self.stdout.write(self.style.ERROR(f"Job {job.pk} failed: {job.error}"))
@@ -0,0 +1,73 @@
+import time
+
+from django.core.management.base import BaseCommand
+from core.models import SEMESTER_CHOICES
+from core.synthetic import (
+    APPROVED_RATIO, CLEARED_RATIO, DENIED_RATIO, SYNTHETIC_PASSWORD, UNLOCKED_RATIO, generate_dataset
+)
+from core.terms import get_current_term
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed the database with a synthetic school of any size using chunked bulk inserts, '
+        'e.g. --students 100000 --offices 5 --seed 1'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000)
+        parser.add_argument('--deans', type=int, default=4)
+        parser.add_argument('--courses-per-dean', type=int, default=3)
+        parser.add_argument('--offices', type=int, default=0, help="Extra offices every student needs clearance from")
+        parser.add_argument('--boarder-ratio', type=float, default=0.3)
+        parser.add_argument('--approved', type=float, default=APPROVED_RATIO, help="Share of requests approved")
+        parser.add_argument('--denied', type=float, default=DENIED_RATIO, help="Share of requests denied")
+        parser.add_argument('--cleared', type=float, default=CLEARED_RATIO, help="Share of students fully cleared")
+        parser.add_argument('--unlocked', type=float, default=UNLOCKED_RATIO, help="Share of cleared permits unlocked")
+        parser.add_argument('--school-year', help="School year, e.g. 2024-2025, defaults to the current term")
+        parser.add_argument(
+            '--semester',
+            choices=[code for code, _ in SEMESTER_CHOICES],
+            help="Semester code, defaults to the current term"
+        )
+        parser.add_argument('--seed', type=int, default=0, help="Random seed, the same seed gives the same data")
+        parser.add_argument('--prefix', default='seed', help="Username prefix, must be unused")
+        parser.add_argument('--password', default=SYNTHETIC_PASSWORD, help="Password of every seeded account")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows written per bulk insert")
+
+    def handle(self, *args, **kwargs):
+        current_school_year, current_semester = get_current_term()
+        school_year = kwargs['school_year'] or current_school_year
+        semester = kwargs['semester'] or current_semester
+
+        self.stdout.write(f"Seeding {kwargs['students']} students for {school_year} {semester}...")
+        started = time.perf_counter()
+        dataset = generate_dataset(
+            students=kwargs['students'],
+            deans=kwargs['deans'],
+            courses_per_dean=kwargs['courses_per_dean'],
+            extra_offices=kwargs['offices'],
+            boarder_ratio=kwargs['boarder_ratio'],
+            approved_ratio=kwargs['approved'],
+            denied_ratio=kwargs['denied'],
+            cleared_ratio=kwargs['cleared'],
+            unlocked_ratio=kwargs['unlocked'],
+            school_year=school_year,
+            semester=semester,
+            seed=kwargs['seed'],
+            prefix=kwargs['prefix'],
+            password=kwargs['password'],
+            chunk_size=kwargs['chunk_size'],
+        )
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {len(dataset['student_ids'])} students in {elapsed:.2f}s "
+            f"({len(dataset['student_ids']) / elapsed:.0f} students/s): "
+            f"{dataset['opened']['clearances_created']} clearances and "
+            f"{dataset['opened']['requests_created']} clearance requests"
+        ))
+        self.stdout.write(
+            f"Log in as {kwargs['prefix']}_student0000000, {dataset['staff'][0].user.username} or "
+            f"{dataset['program_chairs'][0].user.username} with password '{kwargs['password']}'"
+        )
@@ -1,11 +1,18 @@
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.contrib.auth.hashers import make_password
 from django.contrib.auth.models import User
-from core.models import Office, Staff, Student, ClearanceRequest, Clearance
+from core.models import Course, Student
+from core.terms import get_current_term
 
 class Command(BaseCommand):
     help = 'Populate database with initial sample student data'
 
     def handle(self, *args, **kwargs):
+        school_year, semester = get_current_term()
+        courses = Course.objects.select_related('dean').in_bulk(field_name='code')
+        # The students share one password, hash it once
+        password_hashes = {}
+
         # Create sample students
         students_data = [
             {
@@ -15,7 +22,7 @@ class Command(BaseCommand):
                 "last_name": "Doe",
                 "email": "john.doe@student.edu",
                 "student_id": "2023-0001",
-                "course": "Computer Science",
+                "course": "BSCS",
                 "year_level": 3,
                 "is_boarder": True
             },
@@ -26,7 +33,7 @@ class Command(BaseCommand):
                 "last_name": "Smith",
                 "email": "jane.smith@student.edu",
                 "student_id": "2023-0002",
-                "course": "Engineering",
+                "course": "BSIT",
                 "year_level": 2,
                 "is_boarder": False
             },
@@ -37,7 +44,7 @@ class Command(BaseCommand):
                 "last_name": "Johnson",
                 "email": "mike.johnson@student.edu",
                 "student_id": "2023-0003",
-                "course": "Business Administration",
+                "course": "BSED",
                 "year_level": 4,
                 "is_boarder": True
             }
@@ -54,26 +61,30 @@ class Command(BaseCommand):
                 }
             )
             if created:
-                user.set_password(student_info["password"])
-                user.save()
+                if student_info["password"] not in password_hashes:
+                    password_hashes[student_info["password"]] = make_password(student_info["password"])
+                user.password = password_hashes[student_info["password"]]
+                user.save(update_fields=['password'])
+
+            course = courses.get(student_info["course"])
+            if course is None:
+                raise CommandError(f"Course {student_info['course']} not found, run populate_data first.")
 
             # Create or get the student profile
             student, created = Student.objects.get_or_create(
                 user=user,
                 defaults={
                     "student_id": student_info["student_id"],
-                    "course": student_info["course"],
+                    "course": course,
                     "year_level": student_info["year_level"],
-                    "is_boarder": student_info["is_boarder"]
+                    "is_boarder": student_info["is_boarder"],
+                    "program_chair": course.dean.programchair_set.first()
                 }
             )
 
             if created:
-                # Create clearance requests for the student based on all required offices.
-                student.create_clearance_requests()
-                
-                # Create an initial clearance record for the student.
-                Clearance.objects.get_or_create(student=student)
+                # Creates the clearance record and the requests for all required offices
+                student.create_clearance_requests(school_year=school_year, semester=semester)
 
                 self.stdout.write(self.style.SUCCESS(
                     f"Created student: {student.user.get_full_name()} ({student.student_id})"
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:22
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Clearance = apps.get_model('core', 'Clearance')
+    ClearanceRequest = apps.get_model('core', 'ClearanceRequest')
+
+    def count_requests(status):
+        requests = ClearanceRequest.objects.filter(
+            student_id=OuterRef('student_id'),
+            school_year=OuterRef('school_year'),
+            semester=OuterRef('semester'),
+            status=status
+        ).order_by().values('student_id').annotate(total=Count('pk')).values('total')
+        return Coalesce(Subquery(requests), 0)
+
+    Clearance.objects.update(
+        pending_count=count_requests('pending'),
+        approved_count=count_requests('approved'),
+        denied_count=count_requests('denied'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='clearance',
+            name='approved_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='clearance',
+            name='denied_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='clearance',
+            name='pending_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
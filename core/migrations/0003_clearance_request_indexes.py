@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_clearance_counters'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clearancerequest',
+            index=models.Index(fields=['office', 'status', '-reviewed_date'], name='clearreq_office_reviewed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clearancerequest',
+            index=models.Index(fields=['office', '-request_date'], name='clearreq_office_requested_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clearancerequest',
+            index=models.Index(fields=['student', 'school_year', 'semester', 'status'], name='clearreq_student_term_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clearancerequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['office', 'request_date', 'id'], name='clearreq_office_pending_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_clearance_request_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_year', models.CharField(max_length=9)),
+                ('semester', models.CharField(choices=[('1ST', 'First Semester'), ('2ND', 'Second Semester'), ('SUM', 'Summer')], max_length=3)),
+                ('report_type', models.CharField(choices=[('pdf', 'PDF Report'), ('excel', 'Excel Report')], max_length=10)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='queued', max_length=10)),
+                ('data_version', models.CharField(help_text='Fingerprint of the report data when the job was queued.', max_length=64)),
+                ('file', models.FileField(blank=True, null=True, upload_to='reports/')),
+                ('error', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'created_at'], name='reportjob_queue_idx'), models.Index(fields=['school_year', 'semester', 'report_type', 'data_version'], name='reportjob_dedup_idx')],
+            },
+        ),
+    ]
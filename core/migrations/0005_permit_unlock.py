@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:34
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_report_job'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PermitUnlock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unlocked_at', models.DateTimeField(auto_now_add=True)),
+                ('clearance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='permit_unlocks', to='core.clearance')),
+                ('unlocked_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='permit_unlocks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-unlocked_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_permit_unlock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AcademicTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('school_year', models.CharField(max_length=9)),
+                ('semester', models.CharField(choices=[('1ST', 'First Semester'), ('2ND', 'Second Semester'), ('SUM', 'Summer')], max_length=3)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('is_current', models.BooleanField(default=False, help_text='Overrides the date ranges when set.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-start_date'],
+                'unique_together': {('school_year', 'semester')},
+            },
+        ),
+    ]
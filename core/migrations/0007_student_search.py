@@ -0,0 +1,48 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:47
+
+from django.db import migrations, models
+
+from core.search import install_search_index, normalize_search_text, uninstall_search_index
+
+
+def populate_search_text(apps, schema_editor):
+    Student = apps.get_model('core', 'Student')
+    students = Student.objects.select_related('user').only(
+        'pk', 'student_id', 'user__first_name', 'user__last_name'
+    ).order_by('pk')
+
+    batch = []
+    for student in students.iterator(chunk_size=2000):
+        student.search_text = normalize_search_text(
+            student.student_id, student.user.first_name, student.user.last_name
+        )
+        batch.append(student)
+        if len(batch) == 2000:
+            Student.objects.bulk_update(batch, ['search_text'])
+            batch = []
+    Student.objects.bulk_update(batch, ['search_text'])
+
+
+def create_search_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_academic_term'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_text',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255),
+        ),
+        migrations.RunPython(populate_search_text, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
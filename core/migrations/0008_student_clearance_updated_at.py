@@ -0,0 +1,18 @@
+# Generated by Django 5.1.6 on 2026-10-18 20:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_student_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='clearance_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.1.6 on 2026-10-18 21:09
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fail_duplicate_pending_jobs(apps, schema_editor):
+    """Keeps the oldest of the queued or running jobs of each report, the constraint allows one."""
+    ReportJob = apps.get_model('core', 'ReportJob')
+    kept = set()
+    duplicates = []
+    pending = ReportJob.objects.filter(status__in=['queued', 'running']).order_by('created_at', 'pk')
+    for job in pending.only('pk', 'school_year', 'semester', 'report_type', 'data_version'):
+        report = (job.school_year, job.semester, job.report_type, job.data_version)
+        if report in kept:
+            duplicates.append(job.pk)
+        kept.add(report)
+    ReportJob.objects.filter(pk__in=duplicates).update(status='failed', error='Duplicate of an earlier job')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_student_clearance_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(fail_duplicate_pending_jobs, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='reportjob',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('school_year', 'semester', 'report_type', 'data_version'), name='reportjob_unique_pending'),
+        ),
+    ]
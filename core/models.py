@@ -1,11 +1,27 @@
-from django.db import models
+import hashlib
+import logging
+import tempfile
+import time
+from datetime import timedelta
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.dispatch import receiver 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_save
+from django.core.files import File
 from django.utils import timezone
 import os
 from django.conf import settings
 from django.templatetags.static import static
+from core.cache import (
+    GLOBAL_SCOPE, REFERENCE_SCOPE, STATS_SCOPE, dean_scope, invalidate_on_commit, office_scope,
+    student_scope, term_scope
+)
+from core.search import normalize_search_text
+from core.terms import clear_term_cache
+
+logger = logging.getLogger(__name__)
 
 SEMESTER_CHOICES = [
     ('1ST', 'First Semester'),
@@ -13,6 +29,40 @@ SEMESTER_CHOICES = [
     ('SUM', 'Summer')
 ]
 
+# Base offices that all students must pass
+BASE_CLEARANCE_OFFICES = [
+    'OSA', 'DSA', 'SSC', 'LIBRARY', 'LABORATORY',
+    'ACCOUNTING OFFICE', 'REGISTRAR OFFICE', 'Guidance Office'
+]
+
+# Request ids sent per statement by bulk_review, far below the bound
+# parameter limits of SQLite (32766) and PostgreSQL (65535)
+BULK_REVIEW_CHUNK_SIZE = 5000
+
+# Schools with a dedicated SSB office, checked in this order against the dean name
+SSB_SCHOOLS = ['SET', 'STE', 'SOCJE', 'SAFES']
+
+def get_required_office_names(dean_name, is_boarder):
+    """
+    Returns the names of the offices a student must be cleared by, given the
+    name of their program chair's dean and whether they are a boarder.
+    """
+    office_names = list(BASE_CLEARANCE_OFFICES)
+
+    # Add dean-specific offices based on student's program chair
+    # Note: Dean offices are not included in clearance requests
+    # They are only for permit printing purposes
+    if dean_name:
+        for school in SSB_SCHOOLS:
+            if school in dean_name:
+                office_names.append(f'SSB {school}')
+                break
+
+    # Add dormitory clearance if student is a boarder
+    if is_boarder:
+        office_names.append('DORMITORY')
+    return office_names
+
 class Dean(models.Model):
     """
     Represents a dean (or school head) who can be assigned to courses.
@@ -139,6 +189,11 @@ class Student(models.Model):
         null=True,
         blank=True
     )
+    # Normalized student ID and name, indexed for search (see core.search)
+    search_text = models.CharField(max_length=255, blank=True, default='', editable=False)
+    # Last change to the student's clearances or clearance requests, the
+    # version behind the ETag of the student pages
+    clearance_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     def get_profile_picture_url(self):
         if self.profile_picture and hasattr(self.profile_picture, 'url'):
@@ -151,6 +206,40 @@ class Student(models.Model):
 
     def __str__(self):
         return f"{self.full_name} ({self.student_id})"
+
+    def build_search_text(self):
+        return normalize_search_text(self.student_id, self.user.first_name, self.user.last_name)
+
+    @classmethod
+    def touch_clearances(cls, students):
+        """
+        Marks the clearances of the given students, a queryset of students or
+        of their ids, as changed. Needed after queryset updates and bulk
+        inserts, saves and deletes are covered by signals.
+        """
+        return cls.objects.filter(pk__in=students).update(clearance_updated_at=timezone.now())
+
+    @classmethod
+    def touch_clearances_on_commit(cls, student_id):
+        """
+        Queues touch_clearances() for a student until the current transaction
+        commits, so a transaction saving many clearance rows touches all of
+        their students with one UPDATE. Runs at once outside a transaction.
+        """
+        connection = transaction.get_connection()
+        # Shared by every callback of the connection: the first one to run
+        # touches all queued students and leaves nothing to the others. Ids
+        # queued in a rolled back transaction are touched with the next one.
+        pending = connection.__dict__.setdefault('pending_clearance_touches', set())
+        pending.add(student_id)
+
+        def flush():
+            if pending:
+                student_ids = list(pending)
+                pending.clear()
+                cls.touch_clearances(student_ids)
+
+        transaction.on_commit(flush)
     
     def approve_student(self, admin_user):
         """Approve a student's registration."""
@@ -163,66 +252,159 @@ class Student(models.Model):
         """
         Creates clearance requests for a specific semester and school year.
         """
-        from core.models import ClearanceRequest, Clearance  # to avoid circular import
-        
-        # Base offices that all students must pass
-        base_offices = [
-            'OSA', 'DSA', 'SSC', 'LIBRARY', 'LABORATORY',
-            'ACCOUNTING OFFICE', 'REGISTRAR OFFICE', 'Guidance Office'
-        ]
-
-        # Add dean-specific offices based on student's program chair
-        # Note: Dean offices are not included in clearance requests
-        # They are only for permit printing purposes
+        dean_name = None
         if self.program_chair and self.program_chair.dean:
             dean_name = self.program_chair.dean.name
-            if 'SET' in dean_name:
-                # For SET students, add SSB SET to their clearance requirements
-                base_offices.append('SSB SET')
-            elif 'STE' in dean_name:
-                # For STE students, add SSB STE to their clearance requirements
-                base_offices.append('SSB STE')
-            elif 'SOCJE' in dean_name:
-                # For SOCJE students, add SSB SOCJE to their clearance requirements
-                base_offices.append('SSB SOCJE')
-            elif 'SAFES' in dean_name:
-                # For SAFES students, add SSB SAFES to their clearance requirements
-                base_offices.append('SSB SAFES')
-
-        required_offices = Office.objects.filter(name__in=base_offices)
-        
-        # Add dormitory clearance if student is a boarder
-        if self.is_boarder:
-            try:
-                dorm_office = Office.objects.get(name='DORMITORY')
-                required_offices = list(required_offices)
-                required_offices.append(dorm_office)
-            except Office.DoesNotExist:
-                print("Dormitory office not found.")
-
-        # Create or get clearance record for this semester
-        clearance, _ = Clearance.objects.get_or_create(
-            student=self,
-            school_year=school_year,
-            semester=semester,
-            defaults={'is_cleared': False}
+
+        required_offices = Office.objects.filter(
+            name__in=get_required_office_names(dean_name, self.is_boarder)
         )
+        if self.is_boarder and not any(office.name == 'DORMITORY' for office in required_offices):
+            logger.warning("Dormitory office not found for boarder %s.", self.student_id)
 
-        # Create clearance requests for each required office
-        for office in required_offices:
-            ClearanceRequest.objects.get_or_create(
+        # One transaction, so the signals of its rows touch the student once
+        with transaction.atomic():
+            # Create or get clearance record for this semester
+            clearance, _ = Clearance.objects.get_or_create(
                 student=self,
-                office=office,
                 school_year=school_year,
                 semester=semester,
-                defaults={'status': 'pending'}
+                defaults={'is_cleared': False}
             )
 
+            # Create clearance requests for each required office
+            for office in required_offices:
+                ClearanceRequest.objects.get_or_create(
+                    student=self,
+                    office=office,
+                    school_year=school_year,
+                    semester=semester,
+                    defaults={'status': 'pending'}
+                )
+
+            # Recount, the requests of a deleted clearance may have been kept
+            clearances = Clearance.objects.filter(pk=clearance.pk)
+            Clearance.rebuild_counters(clearances)
+            Clearance.update_cleared_flags(clearances)
+
+    @classmethod
+    def open_semester(cls, school_year, semester, students=None, chunk_size=1000):
+        """
+        Creates the clearance record and the per-office clearance requests for
+        many students at once, skipping rows that already exist.
+
+        Offices are resolved once per (dean, boarder) combination and rows are
+        written with chunked bulk inserts. Returns a dict of counts and the
+        elapsed time in seconds.
+        """
+        started = time.perf_counter()
+        if students is None:
+            students = cls.objects.all()
+
+        offices_by_name = dict(Office.objects.values_list('name', 'id'))
+        office_ids_by_profile = {}
+
+        student_rows = list(
+            students.order_by('pk').values_list('pk', 'is_boarder', 'program_chair__dean__name')
+        )
+        clearances_before = Clearance.objects.filter(school_year=school_year, semester=semester).count()
+        requests_before = ClearanceRequest.objects.filter(school_year=school_year, semester=semester).count()
+
+        with transaction.atomic():
+            for offset in range(0, len(student_rows), chunk_size):
+                clearances = []
+                clearance_requests = []
+                for student_id, is_boarder, dean_name in student_rows[offset:offset + chunk_size]:
+                    profile = (dean_name, is_boarder)
+                    if profile not in office_ids_by_profile:
+                        office_ids_by_profile[profile] = [
+                            offices_by_name[name]
+                            for name in get_required_office_names(dean_name, is_boarder)
+                            if name in offices_by_name
+                        ]
+                    clearances.append(Clearance(
+                        student_id=student_id,
+                        school_year=school_year,
+                        semester=semester,
+                        is_cleared=False
+                    ))
+                    clearance_requests.extend(
+                        ClearanceRequest(
+                            student_id=student_id,
+                            office_id=office_id,
+                            school_year=school_year,
+                            semester=semester,
+                            status='pending'
+                        )
+                        for office_id in office_ids_by_profile[profile]
+                    )
+                Clearance.objects.bulk_create(clearances, batch_size=chunk_size, ignore_conflicts=True)
+                ClearanceRequest.objects.bulk_create(
+                    clearance_requests, batch_size=chunk_size, ignore_conflicts=True
+                )
+            cls.touch_clearances(students)
+
+            # Conflicting rows were skipped, so recount instead of incrementing
+            Clearance.rebuild_counters(Clearance.objects.filter(
+                school_year=school_year,
+                semester=semester,
+                student__in=students
+            ))
+
+        # bulk_create does not send post_save signals
+        invalidate_on_commit(GLOBAL_SCOPE, STATS_SCOPE, term_scope(school_year, semester))
+
+        elapsed = time.perf_counter() - started
+        return {
+            'students': len(student_rows),
+            'clearances_created': Clearance.objects.filter(
+                school_year=school_year, semester=semester
+            ).count() - clearances_before,
+            'requests_created': ClearanceRequest.objects.filter(
+                school_year=school_year, semester=semester
+            ).count() - requests_before,
+            'elapsed': elapsed,
+            'students_per_second': len(student_rows) / elapsed if elapsed else 0,
+        }
+
 @receiver(post_save, sender=User)
 def create_student_profile(sender, instance, created, **kwargs):
     # Automatic student profile creation is disabled as it is managed in view logic.
     pass
 
+@receiver(pre_save, sender=Student)
+def update_student_search_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.search_text = instance.build_search_text()
+
+@receiver(post_save, sender=User)
+def update_student_search_text_from_user(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only save last_login, only name changes touch the search text
+    if created or (update_fields is not None and not {'first_name', 'last_name'} & set(update_fields)):
+        return
+    student = Student.objects.filter(user=instance).only('pk', 'student_id', 'search_text').first()
+    if student is not None:
+        student.user = instance
+        search_text = student.build_search_text()
+        if search_text != student.search_text:
+            Student.objects.filter(pk=student.pk).update(search_text=search_text)
+
+class ClearanceRequestQuerySet(models.QuerySet):
+    def handleable_by(self, staff):
+        """
+        Filters to the requests a staff member can handle. Expresses the rules
+        of ClearanceRequest.validate_staff_permission as a single SQL filter.
+        """
+        # Dormitory clearances can only be handled by the student's assigned owner
+        dormitory_rule = ~Q(office__name="DORMITORY")
+        if staff.is_dormitory_owner:
+            dormitory_rule |= Q(student__dormitory_owner=staff)
+
+        # SSB clearances can only be handled for students from the office's school
+        ssb_rule = ~Q(office__name__startswith='SSB') | Q(office__affiliated_dean=F('student__course__dean'))
+
+        return self.filter(Q(office_id=staff.office_id) & dormitory_rule & ssb_rule)
+
 class ClearanceRequest(models.Model):
     """Represents clearance requests for students dynamically per office."""
     student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='clearance_requests')
@@ -241,16 +423,33 @@ class ClearanceRequest(models.Model):
     reviewed_date = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True, null=True, help_text="Reasons for pending or denied clearance.")
 
+    objects = ClearanceRequestQuerySet.as_manager()
+
     class Meta:
         unique_together = ['student', 'office', 'school_year', 'semester']
         ordering = ['-school_year', '-semester', '-request_date']
+        indexes = [
+            # Staff history and today's approvals: office + status, by review date
+            models.Index(fields=['office', 'status', '-reviewed_date'], name='clearreq_office_reviewed_idx'),
+            # Staff recent requests: office, newest first
+            models.Index(fields=['office', '-request_date'], name='clearreq_office_requested_idx'),
+            # Clearance counters: a student's requests for a semester by status
+            models.Index(fields=['student', 'school_year', 'semester', 'status'], name='clearreq_student_term_idx'),
+            # Pending queues, only on backends that support partial indexes
+            models.Index(
+                fields=['office', 'request_date', 'id'],
+                condition=Q(status='pending'),
+                name='clearreq_office_pending_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.office} - {self.school_year} {self.get_semester_display()} ({self.status})"
 
     def validate_staff_permission(self, staff):
         """Validates if a staff member can handle this clearance request."""
-        if staff.office != self.office:
+        # Compare ids where possible so that no related rows are loaded
+        if staff.office_id != self.office_id:
             raise PermissionError(
                 f"You don't have permission to handle clearance requests for {self.office.name}. "
                 f"You can only handle requests for {staff.office.name}."
@@ -260,33 +459,112 @@ class ClearanceRequest(models.Model):
         if self.office.name == "DORMITORY":
             if not staff.is_dormitory_owner:
                 raise PermissionError("Only dormitory owners can handle dormitory clearances.")
-            if self.student.dormitory_owner != staff:
+            if self.student.dormitory_owner_id != staff.pk:
                 raise PermissionError("You can only handle clearances for your assigned students.")
 
         # Special handling for SSB offices
         if self.office.name.startswith('SSB'):
-            student_dean = self.student.course.dean
-            if self.office.affiliated_dean != student_dean:
+            student_dean_id = self.student.course.dean_id
+            if self.office.affiliated_dean_id != student_dean_id:
                 raise PermissionError(
                     "You can only handle SSB clearances for students from your school."
                 )
 
+    @classmethod
+    def bulk_review(cls, staff, clearance_requests, status, reason=None):
+        """
+        Approves or denies every pending request in the given queryset that
+        the staff member may handle, in one transaction. Requests are updated
+        and their clearances recounted BULK_REVIEW_CHUNK_SIZE at a time.
+
+        Returns a dict mapping each request id to its outcome: the new status,
+        'forbidden' or 'already_processed'.
+        """
+        if status not in ('approved', 'denied'):
+            raise ValueError(f"Invalid review status: {status}")
+        if status == 'denied' and not reason:
+            raise ValueError("A reason must be provided when denying a clearance request.")
+
+        with transaction.atomic():
+            # Locked, so the statuses read here are the ones the UPDATE sees
+            # and a request approved concurrently is reported as processed
+            rows = dict(clearance_requests.select_for_update(of=('self',)).values_list('pk', 'status'))
+            permitted_ids = set(clearance_requests.handleable_by(staff).values_list('pk', flat=True))
+            reviewable_ids = [
+                pk for pk, current_status in rows.items()
+                if pk in permitted_ids and current_status == 'pending'
+            ]
+
+            changes = {
+                'status': status,
+                'reviewed_by': staff,
+                'reviewed_date': timezone.now(),
+            }
+            if status == 'denied':
+                changes['notes'] = reason
+            terms = set()
+            for offset in range(0, len(reviewable_ids), BULK_REVIEW_CHUNK_SIZE):
+                chunk = cls.objects.filter(pk__in=reviewable_ids[offset:offset + BULK_REVIEW_CHUNK_SIZE])
+                chunk.filter(status='pending').update(**changes)
+
+                affected = Clearance.objects.filter(Exists(chunk.filter(
+                    student_id=OuterRef('student_id'),
+                    school_year=OuterRef('school_year'),
+                    semester=OuterRef('semester')
+                )))
+                Clearance.rebuild_counters(affected)
+                Clearance.update_cleared_flags(affected)
+                Student.touch_clearances(chunk.values('student_id'))
+                terms.update(chunk.values_list('school_year', 'semester').distinct())
+
+        # Queryset updates do not send post_save signals
+        invalidate_on_commit(STATS_SCOPE, office_scope(staff.office_id), *(
+            term_scope(school_year, semester) for school_year, semester in terms
+        ))
+
+        results = {}
+        for pk, current_status in rows.items():
+            if pk not in permitted_ids:
+                results[pk] = 'forbidden'
+            elif current_status != 'pending':
+                results[pk] = 'already_processed'
+            else:
+                results[pk] = status
+        return results
+
+    def _review(self, staff, status, **changes):
+        """
+        Moves this request to a reviewed status and updates the counters of
+        the matching clearance in the same transaction.
+        """
+        with transaction.atomic():
+            previous_status = ClearanceRequest.objects.select_for_update().values_list(
+                'status', flat=True
+            ).get(pk=self.pk)
+
+            self.status = status
+            self.reviewed_by = staff
+            self.reviewed_date = timezone.now()
+            for field, value in changes.items():
+                setattr(self, field, value)
+            self.save()
+
+            if previous_status != status:
+                clearances = Clearance.objects.filter(
+                    student_id=self.student_id,
+                    school_year=self.school_year,
+                    semester=self.semester
+                )
+                clearances.update(**{
+                    f'{previous_status}_count': F(f'{previous_status}_count') - 1,
+                    f'{status}_count': F(f'{status}_count') + 1,
+                })
+                Clearance.update_cleared_flags(clearances)
+
     def approve(self, staff):
         """Approve a clearance request."""
         self.validate_staff_permission(staff)
-        
-        self.status = "approved"
-        self.reviewed_by = staff
-        self.reviewed_date = timezone.now()
-        self.save()
-
-        # Check if all clearances for this semester are complete
-        clearance = Clearance.objects.get(
-            student=self.student,
-            school_year=self.school_year,
-            semester=self.semester
-        )
-        clearance.check_clearance()
+        self._review(staff, "approved")
 
     def deny(self, staff, reason):
         """Deny a clearance request with a reason."""
@@ -294,12 +572,7 @@ class ClearanceRequest(models.Model):
             raise ValueError("A reason must be provided when denying a clearance request.")
         
         self.validate_staff_permission(staff)
-        
-        self.status = "denied"
-        self.reviewed_by = staff
-        self.notes = reason
-        self.reviewed_date = timezone.now()
-        self.save()
+        self._review(staff, "denied", notes=reason)
 
     def can_be_handled_by(self, staff):
         """Check if a staff member can handle this clearance request."""
@@ -309,6 +582,34 @@ class ClearanceRequest(models.Model):
         except PermissionError:
             return False
 
+class AcademicTerm(models.Model):
+    """
+    A semester of the academic calendar. The term flagged as current is used
+    everywhere the current semester is needed, otherwise the term whose date
+    range covers today.
+    """
+    SEMESTER_CHOICES = SEMESTER_CHOICES
+    school_year = models.CharField(max_length=9)  # Format: 2023-2024
+    semester = models.CharField(max_length=3, choices=SEMESTER_CHOICES)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_current = models.BooleanField(default=False, help_text="Overrides the date ranges when set.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ['school_year', 'semester']
+        ordering = ['-start_date']
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            if self.is_current:
+                # Only one term can be flagged as current
+                AcademicTerm.objects.filter(is_current=True).exclude(pk=self.pk).update(is_current=False)
+            super().save(*args, **kwargs)
+
+    def __str__(self):
+        return f"{self.school_year} {self.get_semester_display()}"
+
 class Clearance(models.Model):
     """Represents the final clearance status of a student."""
     SEMESTER_CHOICES = SEMESTER_CHOICES  # Reference the module-level choices
@@ -319,35 +620,332 @@ class Clearance(models.Model):
     cleared_date = models.DateTimeField(null=True, blank=True)
     program_chair_approved = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
+    # Denormalized request counters, kept in sync by ClearanceRequest reviews and signals
+    pending_count = models.IntegerField(default=0)
+    approved_count = models.IntegerField(default=0)
+    denied_count = models.IntegerField(default=0)
 
     class Meta:
         unique_together = ['student', 'school_year', 'semester']
         ordering = ['-school_year', '-semester']
 
+    @property
+    def progress_percentage(self):
+        total = self.pending_count + self.approved_count + self.denied_count
+        if total <= 0:
+            return 0
+        return round(self.approved_count * 100 / total)
+
     def check_clearance(self):
-        # Check clearance requests for this specific semester and school year
-        pending_requests = self.student.clearance_requests.filter(
-            school_year=self.school_year,
-            semester=self.semester,
-            status='pending'
-        ).exists()
-        denied_requests = self.student.clearance_requests.filter(
-            school_year=self.school_year,
-            semester=self.semester,
-            status='denied'
-        ).exists()
-        
-        if not pending_requests and not denied_requests:
-            self.is_cleared = True
-            self.cleared_date = timezone.now()
-            self.save()
+        # Derive the cleared flag from the request counters of this semester
+        Clearance.update_cleared_flags(Clearance.objects.filter(pk=self.pk))
+        self.refresh_from_db(fields=['is_cleared', 'cleared_date'])
+
+    @classmethod
+    def update_cleared_flags(cls, clearances):
+        """
+        Marks clearances as cleared once they have approved requests and none
+        pending or denied, and as not cleared again once a request is pending
+        or denied. Returns the number of clearances updated.
+        """
+        uncleared = clearances.filter(
+            Q(pending_count__gt=0) | Q(denied_count__gt=0), is_cleared=True
+        ).update(is_cleared=False, cleared_date=None)
+        return uncleared + clearances.filter(
+            is_cleared=False,
+            pending_count__lte=0,
+            denied_count__lte=0,
+            approved_count__gt=0
+        ).update(is_cleared=True, cleared_date=timezone.now())
+
+    @classmethod
+    def rebuild_counters(cls, clearances=None):
+        """
+        Recomputes the request counters from the clearance requests table.
+        Returns the number of clearances updated.
+        """
+        if clearances is None:
+            clearances = cls.objects.all()
+
+        def count_requests(status):
+            requests = ClearanceRequest.objects.filter(
+                student_id=OuterRef('student_id'),
+                school_year=OuterRef('school_year'),
+                semester=OuterRef('semester'),
+                status=status
+            ).order_by().values('student_id').annotate(total=Count('pk')).values('total')
+            return Coalesce(Subquery(requests), 0)
+
+        return clearances.update(
+            pending_count=count_requests('pending'),
+            approved_count=count_requests('approved'),
+            denied_count=count_requests('denied'),
+        )
 
-    def unlock_permit(self):
+    def unlock_permit(self, unlocked_by=None):
         if self.is_cleared:
-            self.program_chair_approved = True
-            self.save()
+            Clearance.unlock_permits(Clearance.objects.filter(pk=self.pk), unlocked_by=unlocked_by)
+            self.refresh_from_db(fields=['program_chair_approved'])
+
+    @classmethod
+    def unlock_permits(cls, clearances, unlocked_by=None):
+        """
+        Unlocks the examination permits of the cleared clearances in the
+        queryset with a single UPDATE and records a PermitUnlock row for each
+        one. Returns counts of unlocked, already unlocked and not yet cleared
+        clearances.
+        """
+        with transaction.atomic():
+            counts = clearances.aggregate(
+                already_unlocked=Count('pk', filter=Q(program_chair_approved=True)),
+                not_cleared=Count('pk', filter=Q(is_cleared=False)),
+            )
+            lockable = clearances.filter(is_cleared=True, program_chair_approved=False)
+            clearance_ids = list(lockable.select_for_update().values_list('pk', flat=True))
+            if clearance_ids:
+                cls.objects.filter(pk__in=clearance_ids).update(program_chair_approved=True)
+                PermitUnlock.objects.bulk_create(
+                    [PermitUnlock(clearance_id=pk, unlocked_by=unlocked_by) for pk in clearance_ids],
+                    batch_size=1000
+                )
+                Student.touch_clearances(cls.objects.filter(pk__in=clearance_ids).values('student_id'))
+                invalidate_on_commit(*(
+                    term_scope(school_year, semester) for school_year, semester in
+                    cls.objects.filter(pk__in=clearance_ids).values_list('school_year', 'semester').distinct()
+                ))
+
+        return {
+            'unlocked': len(clearance_ids),
+            'already_unlocked': counts['already_unlocked'],
+            'not_cleared': counts['not_cleared'],
+        }
 
     def __str__(self):
         status = 'Cleared' if self.is_cleared else 'Not Cleared'
         permit_status = 'Permit Unlocked' if self.program_chair_approved else 'Permit Locked'
         return f"{self.student} - {self.school_year} {self.get_semester_display()} - {status} - {permit_status}"
+
+class PermitUnlock(models.Model):
+    """Audit trail of examination permit unlocks."""
+    clearance = models.ForeignKey(Clearance, on_delete=models.CASCADE, related_name='permit_unlocks')
+    unlocked_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='permit_unlocks')
+    unlocked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-unlocked_at']
+
+    def __str__(self):
+        return f"Permit unlocked for {self.clearance_id} by {self.unlocked_by} on {self.unlocked_at}"
+
+class ReportJob(models.Model):
+    """A queued clearance report, built by the run_report_worker command."""
+    REPORT_TYPES = [
+        ('pdf', 'PDF Report'),
+        ('excel', 'Excel Report'),
+    ]
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ]
+    FILE_EXTENSIONS = {'pdf': 'pdf', 'excel': 'xlsx'}
+    # A running job not finished after this long is presumed lost with its worker
+    STALE_AFTER = timedelta(minutes=30)
+
+    school_year = models.CharField(max_length=9)  # Format: 2023-2024
+    semester = models.CharField(max_length=3, choices=SEMESTER_CHOICES)
+    report_type = models.CharField(max_length=10, choices=REPORT_TYPES)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    data_version = models.CharField(max_length=64, help_text="Fingerprint of the report data when the job was queued.")
+    file = models.FileField(upload_to='reports/', blank=True, null=True)
+    error = models.TextField(blank=True, null=True)
+    requested_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='report_jobs')
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='reportjob_queue_idx'),
+            models.Index(fields=['school_year', 'semester', 'report_type', 'data_version'], name='reportjob_dedup_idx'),
+        ]
+        constraints = [
+            # At most one pending job per report, see enqueue()
+            models.UniqueConstraint(
+                fields=['school_year', 'semester', 'report_type', 'data_version'],
+                condition=Q(status__in=['queued', 'running']),
+                name='reportjob_unique_pending',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_report_type_display()} {self.school_year} {self.get_semester_display()} ({self.status})"
+
+    @property
+    def filename(self):
+        return f"clearance_report_{self.school_year}_{self.semester}.{self.FILE_EXTENSIONS[self.report_type]}"
+
+    @staticmethod
+    def get_data_version(school_year, semester):
+        """
+        Fingerprints the clearance data of a semester. Any request created,
+        deleted or reviewed, or any clearance created or cleared, changes it.
+        """
+        requests = ClearanceRequest.objects.filter(school_year=school_year, semester=semester).aggregate(
+            total=Count('pk'), last_requested=Max('request_date'), last_reviewed=Max('reviewed_date')
+        )
+        clearances = Clearance.objects.filter(school_year=school_year, semester=semester).aggregate(
+            total=Count('pk'), last_cleared=Max('cleared_date')
+        )
+        fingerprint = f"{sorted(requests.items())}{sorted(clearances.items())}"
+        return hashlib.sha256(fingerprint.encode()).hexdigest()
+
+    @classmethod
+    def enqueue(cls, school_year, semester, report_type, requested_by=None):
+        """
+        Returns the job for a report, reusing a queued, running or finished
+        job for the same report and data instead of creating a duplicate.
+        The reportjob_unique_pending constraint settles concurrent requests.
+        """
+        # A stuck job would be handed out forever, queue it again instead
+        cls.requeue_stale()
+        data_version = cls.get_data_version(school_year, semester)
+        jobs = cls.objects.filter(
+            school_year=school_year,
+            semester=semester,
+            report_type=report_type,
+            data_version=data_version
+        )
+        job = jobs.filter(status__in=['queued', 'running', 'done']).order_by('-created_at').first()
+        if job is None:
+            try:
+                with transaction.atomic():
+                    job = cls.objects.create(
+                        school_year=school_year,
+                        semester=semester,
+                        report_type=report_type,
+                        data_version=data_version,
+                        requested_by=requested_by
+                    )
+            except IntegrityError:
+                # Queued by a concurrent request since the lookup
+                job = jobs.get(status__in=['queued', 'running'])
+        return job
+
+    @classmethod
+    def requeue_stale(cls):
+        """Queues again the running jobs started more than STALE_AFTER ago, returns how many."""
+        return cls.objects.filter(
+            status='running', started_at__lt=timezone.now() - cls.STALE_AFTER
+        ).update(status='queued', started_at=None)
+
+    @classmethod
+    def claim_next(cls):
+        """
+        Marks the oldest queued job as running and returns it, or None when
+        the queue is empty. Safe with several workers: a job is only returned
+        to the worker whose update changed its status. Jobs left running by
+        a worker that went away are queued again first.
+        """
+        cls.requeue_stale()
+        while True:
+            job = cls.objects.filter(status='queued').order_by('created_at').first()
+            if job is None:
+                return None
+            started_at = timezone.now()
+            if cls.objects.filter(pk=job.pk, status='queued').update(status='running', started_at=started_at):
+                job.status = 'running'
+                job.started_at = started_at
+                return job
+
+    def run(self):
+        """Builds the report file and stores it under MEDIA_ROOT."""
+        from core.utils import generate_excel_report, generate_pdf_report, get_report_data
+
+        try:
+            with tempfile.TemporaryFile() as report_file:
+                if self.report_type == 'pdf':
+                    generate_pdf_report(report_file, get_report_data(self.school_year, self.semester))
+                else:
+                    generate_excel_report(report_file, self.school_year, self.semester)
+                report_file.seek(0)
+                self.file.save(self.filename, File(report_file), save=False)
+            self.status = 'done'
+        except Exception as e:
+            self.status = 'failed'
+            self.error = str(e)
+        self.finished_at = timezone.now()
+        self.save()
+
+def invalidate_global_caches(**kwargs):
+    """Drops the cached entries of the global scope, such as the admin dashboard statistics."""
+    invalidate_on_commit(GLOBAL_SCOPE)
+
+def invalidate_clearance_caches(sender, instance, **kwargs):
+    """Bumps the statistics, student, term and, for requests, office scopes of a clearance or clearance request."""
+    scopes = [STATS_SCOPE, student_scope(instance.student_id), term_scope(instance.school_year, instance.semester)]
+    if sender is ClearanceRequest:
+        scopes.append(office_scope(instance.office_id))
+    invalidate_on_commit(*scopes)
+    Student.touch_clearances_on_commit(instance.student_id)
+
+def count_clearance_request(sender, instance, **kwargs):
+    """
+    Counts a clearance request created or deleted one at a time, such as from
+    the admin, in the counters of its clearance. Reviews and the bulk paths
+    keep the counters themselves.
+    """
+    if kwargs.get('raw') or (kwargs['signal'] is post_save and not kwargs['created']):
+        return
+    step = 1 if kwargs['signal'] is post_save else -1
+    clearances = Clearance.objects.filter(
+        student_id=instance.student_id, school_year=instance.school_year, semester=instance.semester
+    )
+    clearances.update(**{f'{instance.status}_count': F(f'{instance.status}_count') + step})
+    Clearance.update_cleared_flags(clearances)
+
+def invalidate_student_caches(sender, instance, **kwargs):
+    """Bumps the scopes of a student and of the dean of their course, and the global one when they come or go."""
+    dean_id = Course.objects.filter(pk=instance.course_id).values_list('dean_id', flat=True).first()
+    scopes = [student_scope(instance.pk), dean_scope(dean_id)]
+    if kwargs['signal'] is post_delete or kwargs.get('created'):
+        scopes.append(GLOBAL_SCOPE)
+    invalidate_on_commit(*scopes)
+
+def invalidate_office_caches(sender, instance, **kwargs):
+    """Bumps the scopes of an office and of its affiliated dean."""
+    invalidate_on_commit(GLOBAL_SCOPE, office_scope(instance.pk), dean_scope(instance.affiliated_dean_id))
+
+def invalidate_reference_data(sender, instance, **kwargs):
+    """Drops the cached form reference lists, see core.reference."""
+    if sender is User:
+        # Only names are part of the lists, skip logins and password changes
+        update_fields = kwargs.get('update_fields')
+        if kwargs.get('created') or (update_fields is not None and not {'first_name', 'last_name'} & set(update_fields)):
+            return
+    invalidate_on_commit(REFERENCE_SCOPE)
+
+for model in (Staff, ProgramChair):
+    post_save.connect(invalidate_global_caches, sender=model, dispatch_uid=f'global_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_global_caches, sender=model, dispatch_uid=f'global_cache_delete_{model.__name__}')
+
+post_save.connect(count_clearance_request, sender=ClearanceRequest, dispatch_uid='clearance_request_count_save')
+post_delete.connect(count_clearance_request, sender=ClearanceRequest, dispatch_uid='clearance_request_count_delete')
+
+for model, receiver_function in (
+    (Clearance, invalidate_clearance_caches),
+    (ClearanceRequest, invalidate_clearance_caches),
+    (Student, invalidate_student_caches),
+    (Office, invalidate_office_caches),
+):
+    post_save.connect(receiver_function, sender=model, dispatch_uid=f'cache_save_{model.__name__}')
+    post_delete.connect(receiver_function, sender=model, dispatch_uid=f'cache_delete_{model.__name__}')
+
+for model in (Dean, Course, Office, ProgramChair, Staff, User):
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_save_{model.__name__}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference_delete_{model.__name__}')
+
+post_save.connect(clear_term_cache, sender=AcademicTerm, dispatch_uid='academic_term_save')
+post_delete.connect(clear_term_cache, sender=AcademicTerm, dispatch_uid='academic_term_delete')
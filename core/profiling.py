@@ -0,0 +1,177 @@
+"""
+Sampled per-view profiling: wall time, SQL query count and time, duplicate
+queries and template render time. Samples are kept in a rolling in-process
+store, read through the superuser-only profiling_stats view.
+
+Enabled by PROFILING_SAMPLE_RATE (0 disables it, 1 profiles every request).
+Unsampled requests only pay for one random() call.
+"""
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+# Samples kept per view
+PROFILING_WINDOW = 200
+# Duplicated statements reported per view
+PROFILING_TOP_DUPLICATES = 5
+
+_current_profile = ContextVar('current_profile', default=None)
+
+
+class RequestProfile:
+    """Measurements of a single sampled request."""
+
+    def __init__(self):
+        self.query_count = 0
+        self.query_time = 0.0
+        self.statements = Counter()
+        self.template_time = 0.0
+        self.template_depth = 0
+
+    def record_query(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.query_time += time.perf_counter() - started
+            self.query_count += 1
+            self.statements[sql] += 1
+
+    @property
+    def duplicate_statements(self):
+        return {sql: count for sql, count in self.statements.items() if count > 1}
+
+
+class ProfileStore:
+    """Rolling window of request samples per view, shared by the threads of a process."""
+
+    def __init__(self, window=PROFILING_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.duplicates = defaultdict(Counter)
+
+    def add(self, view_name, sample, duplicate_statements):
+        with self.lock:
+            self.samples[view_name].append(sample)
+            self.duplicates[view_name].update(duplicate_statements)
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.duplicates.clear()
+
+    def summary(self):
+        """Returns per-view percentiles and averages, slowest p95 first."""
+        with self.lock:
+            samples = {view_name: list(view_samples) for view_name, view_samples in self.samples.items()}
+            duplicates = {
+                view_name: counter.most_common(PROFILING_TOP_DUPLICATES)
+                for view_name, counter in self.duplicates.items()
+            }
+
+        views = []
+        for view_name, view_samples in samples.items():
+            wall_times = sorted(sample['wall_ms'] for sample in view_samples)
+            views.append({
+                'view': view_name,
+                'samples': len(view_samples),
+                'wall_ms': {
+                    'p50': percentile(wall_times, 50),
+                    'p95': percentile(wall_times, 95),
+                    'max': wall_times[-1],
+                },
+                'queries': {
+                    'avg': round(statistics.mean(sample['queries'] for sample in view_samples), 1),
+                    'max': max(sample['queries'] for sample in view_samples),
+                    'avg_duplicates': round(statistics.mean(sample['duplicates'] for sample in view_samples), 1),
+                    'avg_ms': round(statistics.mean(sample['sql_ms'] for sample in view_samples), 2),
+                },
+                'template_ms': round(statistics.mean(sample['template_ms'] for sample in view_samples), 2),
+                'top_duplicates': [
+                    {'sql': sql[:300], 'count': count} for sql, count in duplicates.get(view_name, [])
+                ],
+            })
+        views.sort(key=lambda view: view['wall_ms']['p95'], reverse=True)
+        return views
+
+
+def percentile(sorted_values, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0
+    index = max(0, min(len(sorted_values) - 1, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+profile_store = ProfileStore()
+
+_original_template_render = Template.render
+
+
+def _timed_template_render(self, context):
+    profile = _current_profile.get()
+    # Only the outermost template is timed, included templates are part of it
+    if profile is None or profile.template_depth:
+        return _original_template_render(self, context)
+
+    profile.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_template_render(self, context)
+    finally:
+        profile.template_time += time.perf_counter() - started
+        profile.template_depth -= 1
+
+
+class ProfilingMiddleware:
+    """Profiles a sample of requests, see PROFILING_SAMPLE_RATE and PROFILING_SERVER_TIMING."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if Template.render is _original_template_render:
+            Template.render = _timed_template_render
+
+    def __call__(self, request):
+        sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0)
+        if not sample_rate or random.random() >= sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current_profile.set(profile)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.record_query))
+                response = self.get_response(request)
+        finally:
+            _current_profile.reset(token)
+        wall_time = time.perf_counter() - started
+
+        duplicate_statements = profile.duplicate_statements
+        match = request.resolver_match
+        view_name = match.view_name if match else 'unresolved'
+        profile_store.add(view_name, {
+            'wall_ms': round(wall_time * 1000, 2),
+            'queries': profile.query_count,
+            'duplicates': sum(duplicate_statements.values()) - len(duplicate_statements),
+            'sql_ms': round(profile.query_time * 1000, 2),
+            'template_ms': round(profile.template_time * 1000, 2),
+        }, duplicate_statements)
+
+        if getattr(settings, 'PROFILING_SERVER_TIMING', False):
+            response['Server-Timing'] = (
+                f'total;dur={wall_time * 1000:.1f}, '
+                f'db;dur={profile.query_time * 1000:.1f};desc="{profile.query_count} queries", '
+                f'tpl;dur={profile.template_time * 1000:.1f}'
+            )
+        return response
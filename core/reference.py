@@ -0,0 +1,40 @@
+"""
+Snapshots of the reference lists used by the registration and user creation
+forms: deans, courses, offices, program chairs and dormitory owners. They
+change a few times a year but are read on every form load, so they are
+cached as one entry under the reference scope. Saving or deleting one of
+their models bumps the scope (see core/models.py).
+"""
+from core.cache import REFERENCE_SCOPE, get_or_set, get_versions
+from core.models import Course, Dean, Office, ProgramChair, Staff
+
+# Safety net only, the snapshot is invalidated by signals
+REFERENCE_DATA_TIMEOUT = 60 * 60 * 24
+
+
+def build_reference_data():
+    """Loads every list with its related rows, names only for the users."""
+    user_fields = ('user', 'user__first_name', 'user__last_name')
+    return {
+        'deans': list(Dean.objects.order_by('name')),
+        'courses': list(Course.objects.select_related('dean').order_by('code')),
+        'offices': list(Office.objects.order_by('name')),
+        'program_chairs': list(
+            ProgramChair.objects.select_related('user', 'dean').only('id', 'dean', *user_fields)
+            .order_by('dean__name', 'user__last_name')
+        ),
+        'dormitory_owners': list(
+            Staff.objects.filter(is_dormitory_owner=True).select_related('user', 'office')
+            .only('id', 'office', 'is_dormitory_owner', *user_fields).order_by('user__last_name')
+        ),
+    }
+
+
+def get_reference_data():
+    """Returns the cached reference lists, see build_reference_data()."""
+    return get_or_set('reference_data', [REFERENCE_SCOPE], build_reference_data, REFERENCE_DATA_TIMEOUT)
+
+
+def get_reference_version():
+    """Version of the reference snapshot, changes whenever the lists may have."""
+    return get_versions([REFERENCE_SCOPE])[REFERENCE_SCOPE]
@@ -0,0 +1,136 @@
+"""
+Resolves what kind of account a user is: student, program chair, staff or
+admin. RoleMiddleware does it once per request and keeps the result in the
+session, so later requests only fetch the profile of that role. The reverse
+one-to-one caches of request.user are filled along the way, user.student,
+user.programchair and user.staff then cost no query in views and templates.
+"""
+import time
+
+from django.contrib.auth.models import User
+
+ROLE_STUDENT = 'student'
+ROLE_PROGRAM_CHAIR = 'programchair'
+ROLE_STAFF = 'staff'
+ROLE_ADMIN = 'admin'
+
+# Profile relations of User, named after their role. Values are the
+# relations fetched along with the profile.
+PROFILE_RELATED = {
+    ROLE_STUDENT: ('course',),
+    ROLE_PROGRAM_CHAIR: ('dean',),
+    ROLE_STAFF: ('office',),
+}
+# Admin profile picture and settings, loaded for superusers
+ADMIN_PROFILE_RELATION = 'userprofile'
+
+ROLE_SESSION_KEY = '_clearance_role'
+# Seconds a session keeps its role before it is resolved again, so profiles
+# added to an account that is logged in are picked up
+ROLE_SESSION_TIMEOUT = 300
+
+
+def resolve_role(user):
+    """
+    Returns (role, profile, relations) for an authenticated user, relations
+    being the profile relations the user has. Costs two queries.
+    """
+    names = list(PROFILE_RELATED) + [ADMIN_PROFILE_RELATION]
+    row = User.objects.filter(pk=user.pk).values_list(*(f'{name}__id' for name in names)).first() or ()
+    relations = [name for name, profile_id in zip(names, row) if profile_id is not None]
+
+    # Superusers count as admins before their staff profile, as the dashboards always did
+    if ROLE_STUDENT in relations:
+        role = ROLE_STUDENT
+    elif ROLE_PROGRAM_CHAIR in relations:
+        role = ROLE_PROGRAM_CHAIR
+    elif user.is_superuser:
+        role = ROLE_ADMIN
+    elif ROLE_STAFF in relations:
+        role = ROLE_STAFF
+    else:
+        role = None
+    return role, load_profile(user, role) if role else None, relations
+
+
+def load_profile(user, role):
+    """Fetches the profile object of a role, None if the user has none."""
+    if role == ROLE_ADMIN:
+        model, related = User._meta.get_field(ADMIN_PROFILE_RELATION).related_model, ()
+    else:
+        model, related = User._meta.get_field(role).related_model, PROFILE_RELATED[role]
+    return model.objects.select_related(*related).filter(user=user).first()
+
+
+def cache_profiles(user, role, profile, relations):
+    """Fills the reverse one-to-one caches of user, misses included."""
+    relation_of_role = ADMIN_PROFILE_RELATION if role == ROLE_ADMIN else role
+    for name in list(PROFILE_RELATED) + [ADMIN_PROFILE_RELATION]:
+        if name == relation_of_role:
+            User._meta.get_field(name).set_cached_value(user, profile)
+        elif name not in relations:
+            User._meta.get_field(name).set_cached_value(user, None)
+    if profile is not None:
+        profile.user = user
+    user.clearance_role = role
+
+
+def get_user_role(user):
+    """Role of a user, as set by RoleMiddleware or resolved on the spot."""
+    if not user.is_authenticated:
+        return None
+    if not hasattr(user, 'clearance_role'):
+        role, profile, relations = resolve_role(user)
+        cache_profiles(user, role, profile, relations)
+    return user.clearance_role
+
+
+def set_request_role(request):
+    """
+    Sets request.role and request.profile for the logged in user, reusing
+    the role kept in the session while it is fresh.
+    """
+    request.role = request.profile = None
+    user = request.user
+    if not user.is_authenticated:
+        return
+
+    cached = request.session.get(ROLE_SESSION_KEY)
+    profile = None
+    if cached and cached['user'] == user.pk and cached['expires'] >= time.time():
+        role, relations = cached['role'], cached['relations']
+        if role not in (ROLE_STUDENT, ROLE_PROGRAM_CHAIR) and (role == ROLE_ADMIN) != user.is_superuser:
+            # Granted or revoked superuser status, checked on the user already loaded
+            cached = None
+        elif role is not None and role != ROLE_ADMIN:
+            profile = load_profile(user, role)
+            if profile is None:
+                cached = None
+        elif role == ROLE_ADMIN:
+            profile = load_profile(user, role) if ADMIN_PROFILE_RELATION in relations else None
+    else:
+        cached = None
+
+    if cached is None:
+        role, profile, relations = resolve_role(user)
+        request.session[ROLE_SESSION_KEY] = {
+            'user': user.pk,
+            'role': role,
+            'relations': relations,
+            'expires': time.time() + ROLE_SESSION_TIMEOUT,
+        }
+
+    cache_profiles(user, role, profile, relations)
+    request.role = role
+    request.profile = profile
+
+
+class RoleMiddleware:
+    """Resolves the role of the logged in user, see set_request_role()."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        set_request_role(request)
+        return self.get_response(request)
@@ -0,0 +1,196 @@
+import unicodedata
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, OperationalError, connection, connections, transaction
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.utils.functional import cached_property
+
+# External content FTS5 table over core_student.search_text, created on
+# SQLite by migration 0007 and kept in sync by triggers
+STUDENT_FTS_TABLE = 'core_student_fts'
+STUDENT_FTS_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_insert AFTER INSERT ON core_student BEGIN
+        INSERT INTO {STUDENT_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_delete AFTER DELETE ON core_student BEGIN
+        INSERT INTO {STUDENT_FTS_TABLE}({STUDENT_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {STUDENT_FTS_TABLE}_update AFTER UPDATE OF search_text ON core_student BEGIN
+        INSERT INTO {STUDENT_FTS_TABLE}({STUDENT_FTS_TABLE}, rowid, search_text) VALUES ('delete', old.id, old.search_text);
+        INSERT INTO {STUDENT_FTS_TABLE}(rowid, search_text) VALUES (new.id, new.search_text);
+    END""",
+]
+# pg_trgm index serving the substring searches on PostgreSQL
+STUDENT_TRGM_INDEX = 'core_student_search_trgm'
+# The trigram tokenizer can only match terms of at least this many characters
+FTS_MIN_TERM_LENGTH = 3
+# Rows counted before the paginator reports an estimate
+ESTIMATED_COUNT_LIMIT = 10000
+
+_fts_available = {}
+
+
+def normalize_search_text(*parts):
+    """Lowercases, strips accents and collapses whitespace, e.g. 'José  Dela Cruz' -> 'jose dela cruz'."""
+    text = ' '.join(part for part in parts if part)
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(text.lower().split())
+
+
+def install_search_index(connection):
+    """
+    Creates the search index of core_student.search_text if it is missing:
+    an FTS5 trigram table with sync triggers on SQLite, a pg_trgm GIN index on
+    PostgreSQL. Safe to run repeatedly. Returns whether an index is in place.
+    """
+    _fts_available.clear()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {STUDENT_TRGM_INDEX} ON core_student USING gin (search_text gin_trgm_ops)"
+            )
+            return True
+        if connection.vendor != 'sqlite':
+            return False
+
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [STUDENT_FTS_TABLE])
+        if cursor.fetchone() is None:
+            try:
+                # The trigram tokenizer needs SQLite 3.34, older builds keep the LIKE fallback
+                with transaction.atomic(using=connection.alias):
+                    cursor.execute(
+                        f"CREATE VIRTUAL TABLE {STUDENT_FTS_TABLE} USING fts5("
+                        f"search_text, content='core_student', content_rowid='id', tokenize='trigram')"
+                    )
+            except OperationalError:
+                return False
+            cursor.execute(f"INSERT INTO {STUDENT_FTS_TABLE}({STUDENT_FTS_TABLE}) VALUES ('rebuild')")
+        # Rebuilding core_student during a migration drops its triggers
+        for trigger in STUDENT_FTS_TRIGGERS:
+            cursor.execute(trigger)
+    return True
+
+
+def uninstall_search_index(connection):
+    """Drops what install_search_index() created."""
+    _fts_available.clear()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f"DROP INDEX IF EXISTS {STUDENT_TRGM_INDEX}")
+        elif connection.vendor == 'sqlite':
+            for action in ('insert', 'delete', 'update'):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {STUDENT_FTS_TABLE}_{action}")
+            cursor.execute(f"DROP TABLE IF EXISTS {STUDENT_FTS_TABLE}")
+
+
+def ensure_search_index(using=DEFAULT_DB_ALIAS, **kwargs):
+    """post_migrate receiver, restores the index once core_student exists."""
+    connection = connections[using]
+    if 'core_student' in connection.introspection.table_names():
+        install_search_index(connection)
+
+
+def student_fts_available():
+    """Whether the SQLite FTS5 table exists on the default connection, checked once per process."""
+    if connection.vendor != 'sqlite':
+        return False
+    if connection.alias not in _fts_available:
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s", [STUDENT_FTS_TABLE]
+                )
+                _fts_available[connection.alias] = cursor.fetchone() is not None
+        except DatabaseError:
+            return False
+    return _fts_available[connection.alias]
+
+
+def search_students(queryset, query, student_field='student'):
+    """
+    Narrows a queryset to rows whose student matches every term of the query
+    as a substring of the student's ID or name. student_field is the path to
+    the Student from the queryset's model, empty for Student itself.
+
+    Uses the FTS5 trigram index on SQLite and the pg_trgm index on
+    PostgreSQL, both created by migration 0007.
+    """
+    terms = normalize_search_text(query).split()
+    if not terms:
+        return queryset
+    prefix = f'{student_field}__' if student_field else ''
+
+    fts_terms = [term for term in terms if len(term) >= FTS_MIN_TERM_LENGTH]
+    if fts_terms and student_fts_available():
+        match = ' AND '.join('"{}"'.format(term.replace('"', '""')) for term in fts_terms)
+        queryset = queryset.filter(**{
+            f'{prefix}id__in': RawSQL(
+                f'SELECT rowid FROM {STUDENT_FTS_TABLE} WHERE {STUDENT_FTS_TABLE} MATCH %s', [match]
+            )
+        })
+        terms = [term for term in terms if len(term) < FTS_MIN_TERM_LENGTH]
+
+    condition = Q()
+    for term in terms:
+        condition &= Q(**{f'{prefix}search_text__contains': term})
+    return queryset.filter(condition)
+
+
+class EstimatedCountPage(Page):
+    """Page of an EstimatedCountPaginator, knows whether rows follow it past the cap."""
+    has_more = False
+
+    def has_next(self):
+        if self.paginator.count_is_estimate:
+            return self.has_more
+        return super().has_next()
+
+    def end_index(self):
+        if self.paginator.count_is_estimate:
+            return self.start_index() + len(self.object_list) - 1
+        return super().end_index()
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that stops counting at ESTIMATED_COUNT_LIMIT rows, so large
+    result sets are not counted in full. count_is_estimate tells whether the
+    count was capped. Pages past the cap stay reachable: each page fetches
+    one extra row to tell whether another one follows.
+    """
+    count_limit = ESTIMATED_COUNT_LIMIT
+
+    @cached_property
+    def count(self):
+        counted = self.object_list[:self.count_limit + 1].count()
+        self.count_is_estimate = counted > self.count_limit
+        return min(counted, self.count_limit)
+
+    count_is_estimate = False
+
+    def validate_number(self, number):
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            # Past the cap a page may exist, page() finds out by fetching it
+            if self.count_is_estimate and int(number) > self.num_pages:
+                return int(number)
+            raise
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if not self.count_is_estimate:
+            return super().page(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows:
+            raise EmptyPage(self.error_messages['no_results'])
+        page = self._get_page(rows[:self.per_page], number, self)
+        page.has_more = len(rows) > self.per_page
+        return page
+
+    def _get_page(self, *args, **kwargs):
+        return EstimatedCountPage(*args, **kwargs)
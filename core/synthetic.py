@@ -0,0 +1,227 @@
+import random
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models import F, OuterRef, Subquery
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from core.models import (
+    BASE_CLEARANCE_OFFICES, SSB_SCHOOLS, Clearance, ClearanceRequest, Course, Dean, Office,
+    ProgramChair, Staff, Student
+)
+from core.terms import get_current_term
+
+SYNTHETIC_PASSWORD = 'synthetic123'
+
+# Share of clearance requests reviewed so far, and of students already fully
+# cleared, roughly what the offices see midway through clearance week
+APPROVED_RATIO = 0.55
+DENIED_RATIO = 0.05
+CLEARED_RATIO = 0.25
+# Share of the cleared students whose permit has been unlocked
+UNLOCKED_RATIO = 0.5
+DENIAL_NOTES = 'Incomplete requirements'
+
+FIRST_NAMES = [
+    'Juan', 'Maria', 'Jose', 'Ana', 'Mark', 'Grace', 'John', 'Angel', 'Paul', 'Joy',
+    'Carlo', 'Kristine', 'Miguel', 'Andrea', 'Rafael', 'Nicole', 'Jerome', 'Camille',
+]
+LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Flores',
+    'Ramos', 'Villanueva', 'Castillo', 'Aquino', 'Navarro', 'Dela Cruz', 'Morales',
+]
+
+
+def generate_dataset(students=1000, deans=4, courses_per_dean=3, extra_offices=0, boarder_ratio=0.3,
+                     approved_ratio=APPROVED_RATIO, denied_ratio=DENIED_RATIO, cleared_ratio=CLEARED_RATIO,
+                     unlocked_ratio=UNLOCKED_RATIO, school_year=None, semester=None, seed=0, prefix='syn',
+                     password=SYNTHETIC_PASSWORD, chunk_size=2000):
+    """
+    Builds a synthetic school: deans with courses and program chairs, the
+    clearance offices with one staff member each, dormitory owners and
+    students. The semester is then opened for every generated student, extra
+    offices add one more request per student each, and the requests are
+    reviewed following the given ratios.
+
+    Every account shares one password, hashed once. Usernames start with
+    prefix so several datasets can live in the same database. Returns the
+    generated accounts and the counts of Student.open_semester().
+    """
+    rng = random.Random(seed)
+    if school_year is None or semester is None:
+        school_year, semester = get_current_term()
+    password_hash = make_password(password)
+
+    def build_user(username, first_name, last_name):
+        return User(
+            username=username,
+            first_name=first_name,
+            last_name=last_name,
+            email=f"{username}@example.com",
+            password=password_hash,
+            is_active=True,
+        )
+
+    with transaction.atomic():
+        dean_objects = []
+        for index in range(deans):
+            school = SSB_SCHOOLS[index] if index < len(SSB_SCHOOLS) else f"SCH{index}"
+            dean_objects.append(Dean(
+                name=f"{school} DEAN {prefix}".upper(),
+                description=f"School {index + 1} ({prefix})"
+            ))
+        dean_objects = Dean.objects.bulk_create(dean_objects)
+
+        courses = Course.objects.bulk_create([
+            Course(
+                code=f"{prefix[:4]}{dean_index:02d}{course_index:02d}".upper(),
+                name=f"Course {course_index + 1} of {dean.name}",
+                dean=dean,
+            )
+            for dean_index, dean in enumerate(dean_objects)
+            for course_index in range(courses_per_dean)
+        ])
+
+        # The shared clearance offices are reused if they already exist
+        office_names = list(BASE_CLEARANCE_OFFICES) + ['DORMITORY']
+        office_names += [f"{prefix} OFFICE {index}".upper() for index in range(extra_offices)]
+        Office.objects.bulk_create([Office(name=name) for name in office_names], ignore_conflicts=True)
+        Office.objects.bulk_create([
+            Office(name=f"SSB {school}", office_type=f"SSB {school}", affiliated_dean=dean)
+            for school, dean in zip(SSB_SCHOOLS, dean_objects)
+        ], ignore_conflicts=True)
+        offices = list(Office.objects.filter(
+            name__in=office_names + [f"SSB {school}" for school in SSB_SCHOOLS]
+        ))
+
+        staff_users = User.objects.bulk_create([
+            build_user(f"{prefix}_staff_{office.pk}", office.name.title(), 'Staff') for office in offices
+        ])
+        staff = Staff.objects.bulk_create([
+            Staff(user=user, office=office, role=f"{office.name} Officer")
+            for user, office in zip(staff_users, offices)
+        ])
+
+        dormitory = next(office for office in offices if office.name == 'DORMITORY')
+        owner_users = User.objects.bulk_create([
+            build_user(f"{prefix}_bh_owner{index}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+            for index in range(max(1, students // 500))
+        ])
+        dormitory_owners = Staff.objects.bulk_create([
+            Staff(user=user, office=dormitory, role='BH Owner', is_dormitory_owner=True) for user in owner_users
+        ])
+
+        chair_users = User.objects.bulk_create([
+            build_user(f"{prefix}_pc_{index}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES))
+            for index in range(len(dean_objects))
+        ])
+        program_chairs = ProgramChair.objects.bulk_create([
+            ProgramChair(user=user, dean=dean) for user, dean in zip(chair_users, dean_objects)
+        ])
+        chair_by_dean = {chair.dean_id: chair for chair in program_chairs}
+
+        approved_at = timezone.now()
+        student_ids = []
+        for offset in range(0, students, chunk_size):
+            count = min(chunk_size, students - offset)
+            users = User.objects.bulk_create([
+                build_user(
+                    f"{prefix}_student{offset + index:07d}", rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+                )
+                for index in range(count)
+            ])
+            student_objects = []
+            for index, user in enumerate(users):
+                course = rng.choice(courses)
+                is_boarder = rng.random() < boarder_ratio
+                student_objects.append(Student(
+                    user=user,
+                    student_id=f"{prefix}-{offset + index:07d}".upper(),
+                    course=course,
+                    year_level=rng.randint(1, 4),
+                    is_boarder=is_boarder,
+                    program_chair=chair_by_dean[course.dean_id],
+                    dormitory_owner=rng.choice(dormitory_owners) if is_boarder else None,
+                    is_approved=True,
+                    approval_date=approved_at,
+                ))
+                # bulk_create skips the pre_save signal that fills it
+                student_objects[-1].search_text = student_objects[-1].build_search_text()
+            student_ids.extend(student.pk for student in Student.objects.bulk_create(student_objects))
+
+        generated_students = Student.objects.filter(user__username__startswith=f"{prefix}_student")
+        opened = Student.open_semester(school_year, semester, students=generated_students, chunk_size=chunk_size)
+
+        extra_office_ids = [office.pk for office in offices if office.name.startswith(f"{prefix} OFFICE".upper())]
+        if extra_office_ids:
+            for offset in range(0, len(student_ids), chunk_size):
+                ClearanceRequest.objects.bulk_create([
+                    ClearanceRequest(
+                        student_id=student_id,
+                        office_id=office_id,
+                        school_year=school_year,
+                        semester=semester,
+                        status='pending'
+                    )
+                    for student_id in student_ids[offset:offset + chunk_size]
+                    for office_id in extra_office_ids
+                ], batch_size=chunk_size, ignore_conflicts=True)
+            opened['requests_created'] += len(student_ids) * len(extra_office_ids)
+
+        apply_status_distribution(
+            generated_students, school_year, semester, approved_ratio, denied_ratio, cleared_ratio,
+            unlocked_ratio, seed
+        )
+
+    return {
+        'school_year': school_year,
+        'semester': semester,
+        'password': password,
+        'deans': dean_objects,
+        'program_chairs': program_chairs,
+        'staff': staff,
+        'dormitory_owners': dormitory_owners,
+        'student_ids': student_ids,
+        'opened': opened,
+    }
+
+
+def apply_status_distribution(students, school_year, semester, approved_ratio, denied_ratio, cleared_ratio,
+                              unlocked_ratio, seed=0):
+    """
+    Reviews the students' requests for a semester with set-based updates.
+    Rows are picked by a hash of their primary key, so the split is stable
+    for a seed and costs a handful of UPDATE statements at any size. The
+    clearance counters, cleared flags and permits are brought in line after.
+    """
+    now = timezone.now()
+    requests = ClearanceRequest.objects.filter(student__in=students, school_year=school_year, semester=semester)
+    clearances = Clearance.objects.filter(student__in=students, school_year=school_year, semester=semester)
+    reviewer = Subquery(
+        Staff.objects.filter(office_id=OuterRef('office_id')).order_by('is_dormitory_owner', 'pk').values('pk')[:1]
+    )
+
+    def bucket(field):
+        # Multiplicative hash of the key into 0..999
+        return Mod(F(field) * 7919 + seed * 104729, 1000)
+
+    approved_limit = round(approved_ratio * 1000)
+    denied_limit = approved_limit + round(denied_ratio * 1000)
+    requests.alias(bucket=bucket('pk')).filter(bucket__lt=approved_limit).update(
+        status='approved', reviewed_by=reviewer, reviewed_date=now
+    )
+    requests.alias(bucket=bucket('pk')).filter(bucket__gte=approved_limit, bucket__lt=denied_limit).update(
+        status='denied', reviewed_by=reviewer, reviewed_date=now, notes=DENIAL_NOTES
+    )
+    requests.alias(bucket=bucket('student_id')).filter(bucket__lt=round(cleared_ratio * 1000)).update(
+        status='approved', reviewed_by=reviewer, reviewed_date=now, notes=None
+    )
+
+    Clearance.rebuild_counters(clearances)
+    Clearance.update_cleared_flags(clearances)
+    Clearance.unlock_permits(
+        clearances.alias(bucket=bucket('student_id')).filter(bucket__lt=round(cleared_ratio * unlocked_ratio * 1000))
+    )
+    Student.touch_clearances(students)
@@ -0,0 +1,96 @@
+import time
+
+from django.utils import timezone
+
+# Seconds a resolved term is reused by a process. Changes made through the
+# ORM clear it right away, this only bounds staleness across processes.
+TERM_CACHE_TIMEOUT = 300
+
+# Number of school years offered in filters before the current one
+SCHOOL_YEARS_BACK = 2
+
+_term_cache = {}
+
+
+def get_current_school_year(today=None):
+    """Returns the school year string (e.g. 2024-2025) for the given date."""
+    today = today or timezone.now()
+    return f"{today.year}-{today.year + 1}"
+
+
+def get_current_semester(today=None):
+    """Determines the current semester based on month."""
+    month = (today or timezone.now()).month
+    if 6 <= month <= 10:
+        return "1ST"
+    elif month >= 11 or month <= 3:
+        return "2ND"
+    return "SUM"
+
+
+def resolve_term(today):
+    """
+    Resolves the (school_year, semester) of a date from the AcademicTerm
+    table: the term flagged as current wins, then the term whose date range
+    covers the date. Falls back to the month based calendar when no term is
+    configured.
+    """
+    from core.models import AcademicTerm
+
+    terms = AcademicTerm.objects.values_list('school_year', 'semester')
+    term = terms.filter(is_current=True).first() or terms.filter(
+        start_date__lte=today, end_date__gte=today
+    ).order_by('-start_date').first()
+    if term is not None:
+        return term
+    return get_current_school_year(today), get_current_semester(today)
+
+
+def get_current_term(today=None):
+    """
+    Returns a (school_year, semester) tuple for the given date, or for today.
+    Today's term is resolved once and kept in a per-process cache.
+    """
+    if today is not None:
+        return resolve_term(today)
+
+    today = timezone.localdate()
+    cached = _term_cache.get('current')
+    if cached is None or cached['date'] != today or cached['expires'] < time.monotonic():
+        cached = {
+            'date': today,
+            'term': resolve_term(today),
+            'expires': time.monotonic() + TERM_CACHE_TIMEOUT,
+        }
+        _term_cache['current'] = cached
+    return cached['term']
+
+
+def get_school_years():
+    """
+    Returns the school years offered in filters, oldest first: the configured
+    academic terms plus the current school year and the ones before it.
+    """
+    cached = _term_cache.get('school_years')
+    if cached is not None and cached['expires'] >= time.monotonic():
+        return cached['school_years']
+
+    from core.models import AcademicTerm
+
+    current_start = int(get_current_term()[0].split('-')[0])
+    school_years = {
+        f"{year}-{year + 1}" for year in range(current_start - SCHOOL_YEARS_BACK, current_start + 1)
+    }
+    school_years.update(AcademicTerm.objects.values_list('school_year', flat=True).distinct())
+    school_years = sorted(school_years)
+
+    _term_cache['school_years'] = {
+        'school_years': school_years,
+        'expires': time.monotonic() + TERM_CACHE_TIMEOUT,
+    }
+    return school_years
+
+
+def clear_term_cache(**kwargs):
+    """Drops the cached term and school years, connected to AcademicTerm changes."""
+    _term_cache.clear()
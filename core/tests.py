@@ -1,3 +1,494 @@
+from base64 import urlsafe_b64encode
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.core.paginator import EmptyPage
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from core.cache import STATS_SCOPE, get_versions
+from core.models import (
+    Clearance, ClearanceRequest, Course, Dean, Office, PermitUnlock, ProgramChair, ReportJob, Staff, Student
+)
+from core.roles import ROLE_SESSION_KEY, ROLE_STAFF, resolve_role
+from core.search import EstimatedCountPaginator
+from core.synthetic import generate_dataset
+from core.terms import clear_term_cache
+from core.views import PENDING_QUEUE_PAGE_SIZE, get_admin_dashboard_statistics
+
+
+# Queries of a program chair dashboard page, whatever its size
+DASHBOARD_QUERIES = 9
+
+
+class ProgramChairDashboardQueryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.dean = Dean.objects.create(name="SET DEAN")
+        cls.course = Course.objects.create(code="BSIT", name="Information Technology", dean=cls.dean)
+        user = User.objects.create(username="pc_set", first_name="Program", last_name="Chair")
+        cls.program_chair = ProgramChair.objects.create(user=user, dean=cls.dean)
+
+    def create_students(self, count):
+        for index in range(Student.objects.count(), Student.objects.count() + count):
+            user = User.objects.create(username=f"student{index}", first_name="Student", last_name=str(index))
+            student = Student.objects.create(
+                user=user,
+                student_id=f"2024-{index:04d}",
+                course=self.course,
+                year_level=1,
+                program_chair=self.program_chair,
+            )
+            Clearance.objects.create(student=student, school_year="2023-2024", semester="1ST")
+            Clearance.objects.create(student=student, school_year="2024-2025", semester="1ST")
+
+    def count_dashboard_queries(self):
+        cache.clear()
+        clear_term_cache()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('program_chair_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        return len(context.captured_queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.client.force_login(self.program_chair.user)
+        # The first request of a session resolves the role, see core.roles
+        self.client.get(reverse('home'))
+
+        self.create_students(2)
+        small_page_queries = self.count_dashboard_queries()
+
+        self.create_students(8)
+        full_page_queries = self.count_dashboard_queries()
+
+        self.assertEqual(small_page_queries, full_page_queries)
+        # Session, user, profile, current term (2), counters, page count, school years, rows
+        self.assertEqual(full_page_queries, DASHBOARD_QUERIES)
+
+
+def assert_counters_consistent(test):
+    """Checks every clearance counter against a recount of its requests."""
+    for clearance in Clearance.objects.all():
+        requests = ClearanceRequest.objects.filter(
+            student_id=clearance.student_id, school_year=clearance.school_year, semester=clearance.semester
+        )
+        test.assertEqual(
+            (clearance.pending_count, clearance.approved_count, clearance.denied_count),
+            tuple(requests.filter(status=status).count() for status in ('pending', 'approved', 'denied')),
+            f"Counters of clearance {clearance.pk}"
+        )
+        test.assertEqual(clearance.is_cleared, not requests.exclude(status='approved').exists())
+
+
+class ClearanceReviewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        clear_term_cache()
+        cls.dataset = generate_dataset(students=12, approved_ratio=0, denied_ratio=0, cleared_ratio=0)
+
+    def reviewer_for(self, clearance_request):
+        return Staff.objects.filter(office=clearance_request.office).filter(
+            Q(is_dormitory_owner=False) | Q(students_dorm=clearance_request.student)
+        ).order_by('is_dormitory_owner').first()
+
+    def test_counters_follow_approve_and_deny(self):
+        student = Student.objects.order_by('pk').first()
+        requests = list(ClearanceRequest.objects.filter(student=student).select_related('office', 'student'))
+        requests[0].deny(self.reviewer_for(requests[0]), "Missing receipt")
+        for clearance_request in requests[1:]:
+            clearance_request.approve(self.reviewer_for(clearance_request))
+        assert_counters_consistent(self)
+        self.assertFalse(Clearance.objects.get(student=student).is_cleared)
+
+        requests[0].approve(self.reviewer_for(requests[0]))
+        assert_counters_consistent(self)
+        self.assertTrue(Clearance.objects.get(student=student).is_cleared)
+
+    def test_new_clearance_touches_the_student_once(self):
+        student = Student.objects.order_by('pk').first()
+        with CaptureQueriesContext(connection) as context, self.captureOnCommitCallbacks(execute=True):
+            student.create_clearance_requests('2099-2100', '1ST')
+        touches = [query for query in context.captured_queries if '"clearance_updated_at"' in query['sql']]
+        self.assertGreater(ClearanceRequest.objects.filter(student=student, school_year='2099-2100').count(), 1)
+        self.assertEqual(len(touches), 1)
+        assert_counters_consistent(self)
+
+    def test_recreated_clearance_counts_the_requests_it_kept(self):
+        student = Student.objects.order_by('pk').first()
+        clearance = Clearance.objects.get(student=student)
+        requests = ClearanceRequest.objects.filter(student=student).select_related('office', 'student')
+        clearance.delete()
+
+        student.create_clearance_requests(clearance.school_year, clearance.semester)
+        assert_counters_consistent(self)
+        first_request = requests.first()
+        first_request.approve(self.reviewer_for(first_request))
+        assert_counters_consistent(self)
+        self.assertFalse(Clearance.objects.get(student=student).is_cleared)
+
+    def test_requests_added_or_removed_one_at_a_time_are_counted(self):
+        student = Student.objects.order_by('pk').first()
+        for clearance_request in ClearanceRequest.objects.filter(student=student).select_related('office', 'student'):
+            clearance_request.approve(self.reviewer_for(clearance_request))
+        self.assertTrue(Clearance.objects.get(student=student).is_cleared)
+
+        extra = ClearanceRequest.objects.create(
+            student=student, office=Office.objects.exclude(clearance_requests__student=student).first(),
+            school_year=Clearance.objects.get(student=student).school_year,
+            semester=Clearance.objects.get(student=student).semester
+        )
+        assert_counters_consistent(self)
+        self.assertFalse(Clearance.objects.get(student=student).is_cleared)
+
+        extra.delete()
+        assert_counters_consistent(self)
+        self.assertTrue(Clearance.objects.get(student=student).is_cleared)
+
+    def test_denying_an_approved_request_unclears_the_clearance(self):
+        student = Student.objects.order_by('pk').first()
+        requests = list(ClearanceRequest.objects.filter(student=student).select_related('office', 'student'))
+        for clearance_request in requests:
+            clearance_request.approve(self.reviewer_for(clearance_request))
+        self.assertTrue(Clearance.objects.get(student=student).is_cleared)
+
+        requests[0].deny(self.reviewer_for(requests[0]), "Unpaid fine")
+        assert_counters_consistent(self)
+        self.assertFalse(Clearance.objects.get(student=student).is_cleared)
+
+    def test_admin_statistics_follow_reviews_once_committed(self):
+        cache.clear()
+        clearance_request = ClearanceRequest.objects.select_related('office', 'student').first()
+        approved = get_admin_dashboard_statistics()['clearance_stats']['approved']
+        version = get_versions([STATS_SCOPE])[STATS_SCOPE]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            clearance_request.approve(self.reviewer_for(clearance_request))
+            self.assertEqual(get_versions([STATS_SCOPE])[STATS_SCOPE], version)
+
+        self.assertEqual(get_admin_dashboard_statistics()['clearance_stats']['approved'], approved + 1)
+
+    def test_handleable_by_matches_can_be_handled_by(self):
+        requests = list(ClearanceRequest.objects.select_related('office', 'student__course'))
+        for staff in Staff.objects.select_related('office'):
+            self.assertEqual(
+                set(ClearanceRequest.objects.handleable_by(staff).values_list('pk', flat=True)),
+                {clearance_request.pk for clearance_request in requests if clearance_request.can_be_handled_by(staff)},
+                f"Requests handleable by {staff}"
+            )
+
+    def test_bulk_review_reports_each_request(self):
+        staff = Staff.objects.get(office__name='LIBRARY', is_dormitory_owner=False, user__username__startswith='syn_')
+        library_requests = ClearanceRequest.objects.filter(office=staff.office)
+        already_approved = library_requests.first()
+        already_approved.approve(staff)
+        foreign_request = ClearanceRequest.objects.filter(office__name='OSA').first()
+
+        # Small chunks, so the requests span several of them
+        with mock.patch('core.models.BULK_REVIEW_CHUNK_SIZE', 5):
+            results = ClearanceRequest.bulk_review(
+                staff, ClearanceRequest.objects.filter(Q(office=staff.office) | Q(pk=foreign_request.pk)), 'approved'
+            )
+
+        self.assertEqual(results[already_approved.pk], 'already_processed')
+        self.assertEqual(results[foreign_request.pk], 'forbidden')
+        self.assertEqual(
+            {pk for pk, outcome in results.items() if outcome == 'approved'},
+            set(library_requests.exclude(pk=already_approved.pk).values_list('pk', flat=True))
+        )
+        self.assertFalse(library_requests.filter(status='pending').exists())
+        assert_counters_consistent(self)
+
+
+class PendingQueueCursorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        clear_term_cache()
+        generate_dataset(students=PENDING_QUEUE_PAGE_SIZE * 2 + 7, approved_ratio=0, denied_ratio=0, cleared_ratio=0)
+        cls.staff = Staff.objects.get(office__name='LIBRARY', is_dormitory_owner=False, user__username__startswith='syn_')
+        # Ties on request_date are broken by id
+        requests = ClearanceRequest.objects.filter(office=cls.staff.office).order_by('pk')
+        requests.filter(pk__in=requests.values('pk')[:20]).update(request_date=timezone.now())
+
+    def test_cursor_walk_has_no_duplicates_or_gaps(self):
+        clear_term_cache()
+        self.client.force_login(self.staff.user)
+        seen = []
+        cursor = None
+        while True:
+            params = {'format': 'json'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('staff_pending_requests'), params).json()
+            self.assertLessEqual(len(data['results']), PENDING_QUEUE_PAGE_SIZE)
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            if not cursor:
+                break
+
+        expected = list(
+            ClearanceRequest.objects.filter(office=self.staff.office, status='pending')
+            .order_by('request_date', 'id').values_list('pk', flat=True)
+        )
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(seen, expected)
+
+    def test_malformed_cursors_are_rejected(self):
+        clear_term_cache()
+        self.client.force_login(self.staff.user)
+        url = reverse('staff_pending_requests')
+        malformed = [b'no separator', b'2024-01-01|x', b'\xff\xfe|1']
+        for cursor in ['not base64!'] + [urlsafe_b64encode(value).decode() for value in malformed]:
+            response = self.client.get(url, {'format': 'json', 'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+            response = self.client.get(url, {'partial': '1', 'cursor': cursor})
+            self.assertEqual(response.status_code, 400)
+            self.assertNotEqual(response['Content-Type'], 'application/json')
+
+            response = self.client.get(url, {'course': '3', 'cursor': cursor})
+            self.assertRedirects(response, f"{url}?course=3", fetch_redirect_response=False)
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Dean.objects.bulk_create(Dean(name=f"DEAN {index:02d}") for index in range(25))
+
+    def make_paginator(self):
+        paginator = EstimatedCountPaginator(Dean.objects.order_by('pk'), 4)
+        paginator.count_limit = 10
+        return paginator
+
+    def test_pages_past_the_cap_are_reachable(self):
+        paginator = self.make_paginator()
+        seen = []
+        page = paginator.get_page(1)
+        while True:
+            seen.extend(dean.pk for dean in page)
+            if not page.has_next():
+                break
+            page = paginator.get_page(page.next_page_number())
+
+        self.assertTrue(paginator.count_is_estimate)
+        self.assertEqual(seen, list(Dean.objects.order_by('pk').values_list('pk', flat=True)))
+        self.assertEqual((page.number, page.start_index(), page.end_index()), (7, 25, 25))
+
+    def test_page_past_the_last_row_is_empty(self):
+        paginator = self.make_paginator()
+        with self.assertRaises(EmptyPage):
+            paginator.page(8)
+
+
+class ReportJobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        clear_term_cache()
+        generate_dataset(students=4, approved_ratio=0, denied_ratio=0, cleared_ratio=0)
+        cls.student = Student.objects.select_related('user').first()
+        cls.program_chair = ProgramChair.objects.select_related('user').first()
+        cls.clearance = Clearance.objects.first()
+
+    def enqueue(self, requested_by):
+        return ReportJob.enqueue(
+            self.clearance.school_year, self.clearance.semester, 'excel', requested_by=requested_by
+        )
+
+    def test_students_cannot_use_reports(self):
+        job = self.enqueue(self.program_chair.user)
+        self.client.force_login(self.student.user)
+        for url in (
+            reverse('generate_reports'),
+            reverse('report_job_status', args=[job.pk]),
+            reverse('download_report', args=[job.pk]),
+        ):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 302, url)
+            self.assertTrue(response.url.startswith(reverse('login')), url)
+        response = self.client.post(reverse('generate_report'), {
+            'school_year': job.school_year, 'semester': job.semester, 'report_type': 'pdf',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_reused_job_is_reachable_by_every_report_user(self):
+        job = self.enqueue(self.program_chair.user)
+        job.status = 'done'
+        job.file.save(job.filename, ContentFile(b'report'))
+        self.addCleanup(job.file.delete)
+        staff = Staff.objects.select_related('user').filter(user__username__startswith='syn_').first()
+
+        self.assertEqual(self.enqueue(staff.user).pk, job.pk)
+        self.client.force_login(staff.user)
+        self.assertEqual(self.client.get(reverse('report_job_status', args=[job.pk])).json()['status'], 'done')
+        response = self.client.get(reverse('download_report', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'report')
+        response.close()
+
+    def test_stale_running_job_is_queued_again(self):
+        job = self.enqueue(self.program_chair.user)
+        self.assertEqual(ReportJob.claim_next().pk, job.pk)
+        ReportJob.objects.filter(pk=job.pk).update(started_at=timezone.now() - ReportJob.STALE_AFTER * 2)
+
+        self.assertEqual(self.enqueue(self.program_chair.user).pk, job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, 'queued')
+        self.assertEqual(ReportJob.claim_next().pk, job.pk)
+
+    def test_one_pending_job_per_report(self):
+        job = self.enqueue(self.program_chair.user)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReportJob.objects.create(
+                school_year=job.school_year, semester=job.semester,
+                report_type=job.report_type, data_version=job.data_version
+            )
+
+
+class RoleMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        office = Office.objects.create(name="LIBRARY")
+        cls.staff = Staff.objects.create(user=User.objects.create(username="librarian"), office=office)
+        cls.admin = User.objects.create(username="admin_set", is_superuser=True, is_staff=True)
+
+    def test_role_is_kept_in_the_session(self):
+        self.client.force_login(self.staff.user)
+        with mock.patch('core.roles.resolve_role', wraps=resolve_role) as resolve:
+            self.client.get(reverse('login'))
+            self.client.get(reverse('login'))
+        self.assertEqual(resolve.call_count, 1)
+        self.assertEqual(self.client.session[ROLE_SESSION_KEY]['role'], ROLE_STAFF)
+
+    def test_demoted_superuser_is_no_longer_admin(self):
+        self.client.force_login(self.admin)
+        self.assertRedirects(self.client.get(reverse('login')), reverse('admin_dashboard'), fetch_redirect_response=False)
+
+        User.objects.filter(pk=self.admin.pk).update(is_superuser=False)
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+        self.assertIsNone(self.client.session[ROLE_SESSION_KEY]['role'])
+        response = self.client.get(reverse('generate_reports'))
+        self.assertTrue(response.url.startswith(reverse('login')))
+
+    def test_promoted_staff_becomes_admin(self):
+        self.client.force_login(self.staff.user)
+        self.assertEqual(self.client.get(reverse('login')).status_code, 200)
+
+        User.objects.filter(pk=self.staff.user.pk).update(is_superuser=True)
+        self.assertRedirects(self.client.get(reverse('login')), reverse('admin_dashboard'), fetch_redirect_response=False)
+
+
+class StudentDashboardETagTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        clear_term_cache()
+        generate_dataset(students=3, approved_ratio=0, denied_ratio=0, cleared_ratio=0)
+        cls.student = Student.objects.select_related('user').order_by('pk').first()
+
+    def setUp(self):
+        self.client.force_login(self.student.user)
+        response = self.client.get(reverse('student_dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.etag = response['ETag']
+
+    def refresh(self):
+        return self.client.get(reverse('student_dashboard'), headers={'if-none-match': self.etag})
+
+    def test_unchanged_refresh_is_not_modified(self):
+        self.assertEqual(self.refresh().status_code, 304)
+
+    def test_approval_changes_the_page(self):
+        clearance_request = ClearanceRequest.objects.filter(student=self.student).select_related('office').first()
+        staff = Staff.objects.filter(office=clearance_request.office, is_dormitory_owner=False).first()
+        with self.captureOnCommitCallbacks(execute=True):
+            clearance_request.approve(staff)
+        self.assertEqual(self.refresh().status_code, 200)
+
+    def test_bulk_review_changes_the_page(self):
+        clearance_request = ClearanceRequest.objects.filter(student=self.student).select_related('office').first()
+        staff = Staff.objects.filter(office=clearance_request.office, is_dormitory_owner=False).first()
+        ClearanceRequest.bulk_review(staff, ClearanceRequest.objects.filter(pk=clearance_request.pk), 'approved')
+        self.assertEqual(self.refresh().status_code, 200)
+
+    def test_counter_rebuild_changes_the_page(self):
+        Clearance.objects.filter(student=self.student).update(pending_count=0)
+        call_command('rebuild_clearance_counters', stdout=StringIO())
+        self.assertEqual(self.refresh().status_code, 200)
+        assert_counters_consistent(self)
+
+
+class PermitUnlockTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cache.clear()
+        clear_term_cache()
+        generate_dataset(students=40, cleared_ratio=0.5, unlocked_ratio=0.3)
+        cls.program_chair = ProgramChair.objects.select_related('user', 'dean').order_by('pk').first()
+        cls.clearance = Clearance.objects.order_by('pk').first()
+
+    def dean_clearances(self):
+        return Clearance.objects.filter(
+            student__course__dean=self.program_chair.dean,
+            school_year=self.clearance.school_year,
+            semester=self.clearance.semester
+        )
+
+    def test_unlock_counts_and_audits_each_unlocked_permit(self):
+        clearances = self.dean_clearances()
+        to_unlock = set(clearances.filter(is_cleared=True, program_chair_approved=False).values_list('pk', flat=True))
+        expected = {
+            'unlocked': len(to_unlock),
+            'already_unlocked': clearances.filter(program_chair_approved=True).count(),
+            'not_cleared': clearances.filter(is_cleared=False).count(),
+        }
+        self.assertTrue(to_unlock)
+        audited_before = set(PermitUnlock.objects.values_list('pk', flat=True))
+
+        self.assertEqual(Clearance.unlock_permits(clearances, unlocked_by=self.program_chair.user), expected)
+
+        audits = PermitUnlock.objects.exclude(pk__in=audited_before)
+        self.assertEqual(sorted(audits.values_list('clearance_id', flat=True)), sorted(to_unlock))
+        self.assertFalse(audits.exclude(unlocked_by=self.program_chair.user).exists())
+        self.assertFalse(clearances.filter(is_cleared=True, program_chair_approved=False).exists())
+
+        # Unlocking again only reports them
+        again = Clearance.unlock_permits(clearances, unlocked_by=self.program_chair.user)
+        self.assertEqual(again['unlocked'], 0)
+        self.assertEqual(again['already_unlocked'], expected['already_unlocked'] + expected['unlocked'])
+        self.assertEqual(audits.count(), len(to_unlock))
+
+    def test_view_only_unlocks_the_program_chairs_dean(self):
+        others = Clearance.objects.exclude(student__course__dean=self.program_chair.dean)
+        other_unlocked = set(others.filter(program_chair_approved=True).values_list('pk', flat=True))
+        expected_unlocked = self.dean_clearances().filter(is_cleared=True, program_chair_approved=False).count()
+
+        self.client.force_login(self.program_chair.user)
+        response = self.client.post(
+            reverse('unlock_permits'),
+            {'school_year': self.clearance.school_year, 'semester': self.clearance.semester},
+            headers={'accept': 'application/json'}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['unlocked'], expected_unlocked)
+        self.assertEqual(set(others.filter(program_chair_approved=True).values_list('pk', flat=True)), other_unlocked)
+        self.assertFalse(PermitUnlock.objects.exclude(clearance__student__course__dean=self.program_chair.dean).filter(
+            unlocked_by=self.program_chair.user
+        ).exists())
 
-# Create your tests here.
+    def test_view_rejects_an_invalid_term(self):
+        self.client.force_login(self.program_chair.user)
+        response = self.client.post(reverse('unlock_permits'), {'school_year': self.clearance.school_year, 'semester': 'XX'})
+        self.assertEqual(response.status_code, 400)
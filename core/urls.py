@@ -14,6 +14,7 @@ urlpatterns = [
     path('dashboard/admin/clearances/', views.admin_clearances, name='admin_clearances'),
     path('dashboard/admin/deans/', views.admin_deans, name='admin_deans'),
     path('dashboard/admin/courses/', views.admin_courses, name='admin_courses'),
+    path('dashboard/admin/profiling/', views.profiling_stats, name='profiling_stats'),
     path('program-chair/students/', views.ManageStudentsView.as_view(), name='manage_students'),
     path('clearance/<int:clearance_id>/delete/', views.delete_clearance, name='delete_clearance'),
     path('clearance-request/<int:request_id>/update/', views.update_clearance_request, name='update_clearance_request'),
@@ -22,8 +23,13 @@ urlpatterns = [
     path('login/', views.user_login, name='login'),
     path('register/', views.register, name='register'),
     path('program-chair/dashboard/', views.program_chair_dashboard, name='program_chair_dashboard'),
+    path('program-chair/permits/<int:clearance_id>/', views.print_permit, name='print_permit'),
+    path('program-chair/permits/', views.print_permits, name='print_permits'),
+    path('program-chair/permits/unlock/', views.unlock_permits, name='unlock_permits'),
     path('generate-reports/', views.generate_reports, name='generate_reports'),
     path('generate-report/', views.generate_report, name='generate_report'),
+    path('reports/<int:job_id>/status/', views.report_job_status, name='report_job_status'),
+    path('reports/<int:job_id>/download/', views.download_report, name='download_report'),
     path('student/create-clearance-requests/', views.create_clearance_requests, name='create_clearance_requests'),
     path('student/clearance/<int:clearance_id>/', 
          views.view_clearance_details, 
@@ -34,6 +40,7 @@ urlpatterns = [
     path('staff/pending-requests/', views.staff_pending_requests, name='staff_pending_requests'),
     path('approve-clearance-request/<int:request_id>/', views.approve_clearance_request, name='approve_clearance_request'),
     path('deny-clearance-request/<int:request_id>/', views.deny_clearance_request, name='deny_clearance_request'),
+    path('staff/pending-requests/bulk-review/', views.bulk_review_clearance_requests, name='bulk_review_clearance_requests'),
     path('staff/clearance-history/', views.staff_clearance_history, name='staff_clearance_history'),
     path('staff/profile/', views.staff_profile, name='staff_profile'),
     path('staff/view-request/<int:request_id>/', views.view_request, name='view_request'),
@@ -42,6 +49,9 @@ urlpatterns = [
 path('api/user-details/<int:user_id>/', views.get_user_details, name='get_user_details'),
 path('api/approve-registration/<int:user_id>/', views.approve_registration, name='approve_registration'),
 path('api/reject-registration/<int:user_id>/', views.reject_registration, name='reject_registration'),
+path('api/program-chairs/<int:dean_id>/', views.get_program_chairs, name='get_program_chairs'),
+path('api/courses/<int:dean_id>/', views.get_courses, name='get_courses'),
+path('api/offices/<int:dean_id>/', views.get_offices, name='get_offices'),
 
 
 ]
@@ -1,8 +1,44 @@
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
+from reportlab.lib.pagesizes import A4, letter
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.colors import HexColor
+from itertools import groupby
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+from django.contrib.staticfiles import finders
+from django.db.models import Count, Exists, OuterRef, Q
+from core.models import SEMESTER_CHOICES, Clearance, ClearanceRequest, Dean, Office
+
+def get_report_data(school_year, semester):
+    """
+    Collects the statistics for the PDF report of a semester with two
+    aggregate queries, one over clearances and one grouped by office.
+    """
+    totals = Clearance.objects.filter(school_year=school_year, semester=semester).aggregate(
+        total_students=Count('pk'),
+        cleared_students=Count('pk', filter=Q(is_cleared=True)),
+    )
+    per_office = ClearanceRequest.objects.filter(
+        school_year=school_year, semester=semester
+    ).values('office__name').annotate(
+        pending=Count('pk', filter=Q(status='pending')),
+        approved=Count('pk', filter=Q(status='approved')),
+        denied=Count('pk', filter=Q(status='denied')),
+    ).order_by('office__name')
+
+    return {
+        'total_students': totals['total_students'],
+        'cleared_students': totals['cleared_students'],
+        'pending_clearance': totals['total_students'] - totals['cleared_students'],
+        'detailed_data': [
+            [row['office__name'], str(row['pending']), str(row['approved']), str(row['denied'])]
+            for row in per_office
+        ],
+    }
 
 def generate_pdf_report(response, data):
     # Create document
@@ -66,7 +102,8 @@ def generate_pdf_report(response, data):
         detailed_headers = [['Department', 'Pending', 'Approved', 'Denied']]
         detailed_data = detailed_headers + data['detailed_data']
         
-        detailed_table = Table(detailed_data, colWidths=[200, 100, 100, 100])
+        # Repeat the header row when a long table splits across pages
+        detailed_table = Table(detailed_data, colWidths=[200, 100, 100, 100], repeatRows=1)
         detailed_table.setStyle(TableStyle([
             ('BACKGROUND', (0, 0), (-1, 0), emerald_dark),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
@@ -82,3 +119,196 @@ def generate_pdf_report(response, data):
     
     # Build PDF
     doc.build(elements)
+
+def generate_excel_report(output, school_year, semester, chunk_size=2000):
+    """
+    Writes every student's per-office clearance status for a semester to an
+    xlsx file. Uses a write-only workbook fed by a chunked iterator, so memory
+    stays flat regardless of the number of students.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=f"{school_year} {semester}")
+
+    term_requests = ClearanceRequest.objects.filter(school_year=school_year, semester=semester)
+    offices = list(
+        Office.objects.filter(
+            Exists(term_requests.filter(office=OuterRef('pk')))
+        ).order_by('name').values_list('id', 'name')
+    )
+    office_columns = {office_id: index for index, (office_id, _) in enumerate(offices)}
+
+    # Emerald header row, matching the PDF report
+    header_font = Font(bold=True, color='FFFFFF')
+    header_fill = PatternFill('solid', fgColor='047857')
+    header = []
+    for title in ['Student ID', 'Last Name', 'First Name', 'Course', 'Year Level'] + [
+        name for _, name in offices
+    ] + ['Overall']:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    sheet.append(header)
+
+    rows = term_requests.order_by('student_id', 'office_id').values_list(
+        'student_id',
+        'student__student_id',
+        'student__user__last_name',
+        'student__user__first_name',
+        'student__course__code',
+        'student__year_level',
+        'office_id',
+        'status',
+    ).iterator(chunk_size=chunk_size)
+
+    for _, student_rows in groupby(rows, key=lambda row: row[0]):
+        statuses = [''] * len(offices)
+        for row in student_rows:
+            statuses[office_columns[row[6]]] = row[7].capitalize()
+        present = [status for status in statuses if status]
+        overall = 'Cleared' if all(status == 'Approved' for status in present) else 'Not Cleared'
+        sheet.append(list(row[1:6]) + statuses + [overall])
+
+    workbook.save(output)
+
+PERMIT_DEFAULT_LOGO = 'img/permit_logo.png'
+PERMIT_SUBJECT_ROWS = 9
+
+def get_permit_logo(dean):
+    """Returns an ImageReader for the dean's logo, falling back to the campus logo."""
+    if dean is not None and dean.logo:
+        try:
+            return ImageReader(dean.logo.path)
+        except (OSError, ValueError):
+            pass
+    path = finders.find(PERMIT_DEFAULT_LOGO)
+    return ImageReader(path) if path else None
+
+def draw_permit_template(pdf, dean):
+    """
+    Draws the parts of a permit that do not depend on the student: border,
+    logo, headings, the subject table and the signature line.
+    """
+    width, height = A4
+    emerald_dark = HexColor('#047857')
+    emerald = HexColor('#059669')
+    emerald_light = HexColor('#ECFDF5')
+
+    pdf.setStrokeColor(emerald)
+    pdf.setLineWidth(3)
+    pdf.rect(40, 40, width - 80, height - 80)
+
+    # Watermark
+    pdf.saveState()
+    pdf.setFillColor(HexColor('#F0FDF4'))
+    pdf.setFont('Helvetica-Bold', 110)
+    pdf.translate(width / 2, height / 2)
+    pdf.rotate(45)
+    pdf.drawCentredString(0, -40, 'JHCSC')
+    pdf.restoreState()
+
+    logo = get_permit_logo(dean)
+    if logo is not None:
+        pdf.drawImage(logo, width / 2 - 36, height - 150, 72, 72, mask='auto', preserveAspectRatio=True)
+
+    pdf.setFillColor(emerald_dark)
+    pdf.setFont('Helvetica-Bold', 16)
+    pdf.drawCentredString(width / 2, height - 175, 'J.H. CERILLES STATE COLLEGE')
+    pdf.setFont('Helvetica-Bold', 13)
+    pdf.drawCentredString(width / 2, height - 193, 'DUMINGAG CAMPUS')
+    pdf.setFont('Helvetica-Oblique', 10)
+    pdf.drawCentredString(width / 2, height - 208, 'Dumingag, Zamboanga del Sur')
+    if dean is not None:
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawCentredString(width / 2, height - 233, dean.description or dean.name)
+
+    pdf.rect(width / 2 - 100, height - 268, 200, 24, stroke=0, fill=1)
+    pdf.setFillColor(colors.white)
+    pdf.setFont('Helvetica-Bold', 13)
+    pdf.drawCentredString(width / 2, height - 260, 'EXAMINATION PERMIT')
+
+    # Student information labels
+    pdf.setFillColor(emerald_light)
+    pdf.rect(60, height - 340, width - 120, 56, stroke=0, fill=1)
+    pdf.setFillColor(emerald_dark)
+    pdf.setFont('Helvetica-Bold', 10)
+    pdf.drawString(70, height - 306, 'NAME:')
+    pdf.drawString(70, height - 330, 'COURSE & YEAR:')
+    pdf.setLineWidth(1)
+    pdf.line(165, height - 309, width - 70, height - 309)
+    pdf.line(165, height - 333, width - 70, height - 333)
+
+    # Subject and signature table
+    table_top = height - 365
+    row_height = 30
+    pdf.rect(60, table_top - row_height, width - 120, row_height, stroke=0, fill=1)
+    pdf.setFillColor(colors.white)
+    pdf.drawCentredString(60 + (width - 120) / 4, table_top - 19, 'SUBJECT')
+    pdf.drawCentredString(60 + 3 * (width - 120) / 4, table_top - 19, "INSTRUCTOR'S SIGNATURE")
+    table_bottom = table_top - row_height * (PERMIT_SUBJECT_ROWS + 1)
+    pdf.setStrokeColor(emerald)
+    pdf.rect(60, table_bottom, width - 120, table_top - table_bottom)
+    pdf.line(width / 2, table_top, width / 2, table_bottom)
+    for row in range(1, PERMIT_SUBJECT_ROWS + 1):
+        pdf.line(60, table_top - row * row_height, width - 60, table_top - row * row_height)
+
+    # Program chair signature line, the name is drawn per page
+    pdf.setFillColor(emerald_dark)
+    pdf.line(width / 2 - 110, 108, width / 2 + 110, 108)
+    pdf.setFont('Helvetica-Bold', 10)
+    pdf.drawCentredString(width / 2, 94, dean.name if dean is not None else 'PROGRAM CHAIR')
+
+def generate_permits_pdf(output, clearances, chunk_size=2000):
+    """
+    Draws one examination permit per clearance into a single A4 PDF.
+
+    The static part of each dean's permit, logo included, is drawn once as a
+    form XObject and stamped on every page, so each page only adds the
+    student's details. Returns the number of permits drawn.
+    """
+    width, height = A4
+    semesters = dict(SEMESTER_CHOICES)
+    deans = Dean.objects.in_bulk()
+
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    pdf.setTitle('Examination Permits')
+    templates = {}
+
+    rows = clearances.order_by(
+        'student__course__dean__name', 'student__course__code', 'student__year_level',
+        'student__user__last_name', 'student__user__first_name', 'pk'
+    ).values_list(
+        'student__course__dean_id',
+        'student__user__first_name',
+        'student__user__last_name',
+        'student__course__code',
+        'student__year_level',
+        'student__program_chair__user__first_name',
+        'student__program_chair__user__last_name',
+        'school_year',
+        'semester',
+    ).iterator(chunk_size=chunk_size)
+
+    count = 0
+    for dean_id, first_name, last_name, course, year_level, chair_first, chair_last, school_year, semester in rows:
+        form_name = f'permit_{dean_id}'
+        if form_name not in templates:
+            pdf.beginForm(form_name)
+            draw_permit_template(pdf, deans.get(dean_id))
+            pdf.endForm()
+            templates[form_name] = True
+
+        pdf.doForm(form_name)
+        pdf.setFillColor(colors.black)
+        pdf.setFont('Helvetica', 11)
+        pdf.drawString(170, height - 306, f"{first_name} {last_name}".strip())
+        pdf.drawString(170, height - 330, f"{course} {year_level}")
+        pdf.setFont('Helvetica', 9)
+        pdf.drawCentredString(width / 2, height - 279, f"{school_year} {semesters.get(semester, semester)}")
+        pdf.setFont('Helvetica-Bold', 12)
+        pdf.drawCentredString(width / 2, 114, f"{chair_first or ''} {chair_last or ''}".strip())
+        pdf.showPage()
+        count += 1
+
+    pdf.save()
+    return count
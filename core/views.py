@@ -1,48 +1,67 @@
 from django.contrib.auth import authenticate, login, logout
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.utils import timezone
+from django.utils.http import urlencode
 from django.core.paginator import Paginator
-from django.db.models import Q
+from django.db.models import F, Q, OuterRef, Subquery, FilteredRelation
+from django.db.models.functions import Coalesce
 from django.views.generic import TemplateView, ListView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, FileResponse
 from django.template.loader import render_to_string
-from datetime import datetime
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timedelta
+import hashlib
 from io import BytesIO
 import os
+import tempfile
 from django.conf import settings
 from django.core.files.storage import default_storage
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 from django.db.models import Count
+from .cache import GLOBAL_SCOPE, STATS_SCOPE, dean_scope, get_or_set, term_scope
 # Add Office to the imports
 from .models import (
     Student, Staff, ProgramChair, Course, 
-    Clearance, ClearanceRequest, Office
+    Clearance, ClearanceRequest, Office, SEMESTER_CHOICES,
+    ReportJob
 )
+from .reference import get_reference_data, get_reference_version
+from .roles import ROLE_ADMIN, ROLE_PROGRAM_CHAIR, ROLE_STAFF, ROLE_STUDENT, get_user_role, set_request_role
+from .terms import get_current_term, get_school_years
+from .search import EstimatedCountPaginator, search_students
+from .profiling import profile_store
+from .utils import PERMIT_DEFAULT_LOGO, generate_permits_pdf
+
+# Program chairs refresh their dashboard constantly during clearance week.
+# Safety net only, the statistics are invalidated by signals.
+PROGRAM_CHAIR_STATS_TIMEOUT = 300
+# Rows per screen of the staff pending queue
+PENDING_QUEUE_PAGE_SIZE = 50
+# Safety net only, the admin statistics are invalidated by signals
+ADMIN_DASHBOARD_STATS_TIMEOUT = 300
+# Where home and login send each role, staff stay on the landing page
+ROLE_DASHBOARDS = {
+    ROLE_STUDENT: 'student_dashboard',
+    ROLE_PROGRAM_CHAIR: 'program_chair_dashboard',
+    ROLE_ADMIN: 'admin_dashboard',
+}
 
 def user_logout(request):
     logout(request)
     return redirect('login')
 def home(request):
-    if request.user.is_authenticated:
-        if hasattr(request.user, 'programchair'):
-            return redirect('program_chair_dashboard')
-        elif hasattr(request.user, 'student'):
-            return redirect('student_dashboard')
-        elif request.user.is_superuser:
-            return redirect('admin_dashboard')
+    if request.role in ROLE_DASHBOARDS:
+        return redirect(ROLE_DASHBOARDS[request.role])
     return render(request, 'home.html')
 
 def user_login(request):
-    if request.user.is_authenticated:
-        if hasattr(request.user, 'student'):
-            return redirect('student_dashboard')
-        elif hasattr(request.user, 'programchair'):  # Changed from staff to programchair
-            return redirect('program_chair_dashboard')
-        elif request.user.is_superuser:
-            return redirect('admin_dashboard')
+    if request.role in ROLE_DASHBOARDS:
+        return redirect(ROLE_DASHBOARDS[request.role])
     
     if request.method == 'POST':
         username = request.POST.get('username')
@@ -55,14 +74,11 @@ def user_login(request):
                 return redirect('login')
             
             login(request, user)
+            set_request_role(request)
             
             # Redirect based on user type
-            if hasattr(user, 'student'):
-                return redirect('student_dashboard')
-            elif hasattr(user, 'programchair'):  # Changed from staff to programchair
-                return redirect('program_chair_dashboard')
-            elif user.is_superuser:
-                return redirect('admin_dashboard')
+            if request.role in ROLE_DASHBOARDS:
+                return redirect(ROLE_DASHBOARDS[request.role])
         else:
             messages.error(request, 'Invalid username or password.')
     
@@ -72,9 +88,10 @@ def register(request):
     if request.user.is_authenticated:
         return redirect('home')
     
+    reference_data = get_reference_data()
     context = {
-        'program_chairs': ProgramChair.objects.all(),
-        'dormitory_owners': Staff.objects.filter(is_dormitory_owner=True)
+        'program_chairs': reference_data['program_chairs'],
+        'dormitory_owners': reference_data['dormitory_owners'],
     }
     
     if request.method == 'POST':
@@ -136,7 +153,27 @@ def register(request):
     
     return render(request, 'registration/register.html', context)
 
+def student_page_etag(request, **kwargs):
+    """
+    ETag of the student pages, computed from the profile loaded by
+    RoleMiddleware without further queries. It changes with the student's
+    clearances (see Student.clearance_updated_at), profile, the current
+    term and the reference lists that name their program chair and
+    reviewers. None while messages are waiting, so they get rendered.
+    """
+    student = request.profile if request.role == ROLE_STUDENT else None
+    if student is None or len(messages.get_messages(request)):
+        return None
+    version = [
+        student.pk, student.clearance_updated_at, student.search_text, student.profile_picture.name,
+        student.course_id, student.year_level, student.is_boarder, student.program_chair_id,
+        student.dormitory_owner_id, get_current_term(), get_reference_version(), sorted(kwargs.items()),
+    ]
+    return hashlib.md5(repr(version).encode()).hexdigest()
+
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=student_page_etag)
 def student_dashboard(request):
     try:
         student = request.user.student
@@ -246,14 +283,6 @@ def update_clearance_request(request, request_id):
             messages.error(request, str(e))
         except Exception as e:
             messages.error(request, f"Error processing request: {str(e)}")
-        
-        # Refresh the student's overall clearance status
-        clearance = Clearance.objects.get(
-            student=clearance_request.student,
-            school_year=clearance_request.school_year,
-            semester=clearance_request.semester
-        )
-        clearance.check_clearance()
 
     return redirect('office_dashboard')
 
@@ -264,7 +293,7 @@ class ManageStudentsView(LoginRequiredMixin, UserPassesTestMixin, ListView):
     context_object_name = 'students'
     
     def test_func(self):
-        return hasattr(self.request.user, 'programchair')  # Changed from is_superuser
+        return self.request.role == ROLE_PROGRAM_CHAIR
     
     def get_queryset(self):
         program_chair = self.request.user.programchair
@@ -302,6 +331,40 @@ def admin_deans(request):
     deans = Dean.objects.all()
     return render(request, 'admin/deans.html', {'deans': deans})
 
+def get_admin_dashboard_statistics():
+    """
+    Returns the admin dashboard statistics block. Computed with one GROUP BY
+    status query plus a few counts, and cached until a relevant model changes.
+    """
+    def compute_stats():
+        status_counts = dict(
+            ClearanceRequest.objects.order_by().values_list('status').annotate(total=Count('pk'))
+        )
+        staff_count = Staff.objects.filter(office=OuterRef('pk')).order_by().values('office').annotate(
+            total=Count('pk')
+        ).values('total')
+        pending_count = ClearanceRequest.objects.filter(
+            office=OuterRef('pk'), status='pending'
+        ).order_by().values('office').annotate(total=Count('pk')).values('total')
+
+        return {
+            'total_students': Student.objects.count(),
+            'total_staff': Staff.objects.count(),
+            'total_program_chairs': ProgramChair.objects.count(),
+            'clearance_stats': {
+                'total': Clearance.objects.count(),
+                'pending': status_counts.get('pending', 0),
+                'approved': status_counts.get('approved', 0),
+                'denied': status_counts.get('denied', 0),
+            },
+            'offices': list(Office.objects.annotate(
+                staff_count=Coalesce(Subquery(staff_count), 0),
+                pending_requests=Coalesce(Subquery(pending_count), 0)
+            )),
+        }
+
+    return get_or_set('admin_dashboard_stats', [GLOBAL_SCOPE, STATS_SCOPE], compute_stats, ADMIN_DASHBOARD_STATS_TIMEOUT)
+
 @login_required
 @user_passes_test(lambda u: u.is_superuser)
 def admin_dashboard(request):
@@ -312,20 +375,8 @@ def admin_dashboard(request):
     ).select_related('user', 'course').order_by('-user__date_joined')
 
     context = {
-        'total_students': Student.objects.count(),
-        'total_staff': Staff.objects.count(),
-        'total_program_chairs': ProgramChair.objects.count(),
-        'clearance_stats': {
-            'total': Clearance.objects.count(),
-            'pending': ClearanceRequest.objects.filter(status='pending').count(),
-            'approved': ClearanceRequest.objects.filter(status='approved').count(),
-            'denied': ClearanceRequest.objects.filter(status='denied').count(),
-        },
-        'recent_clearances': Clearance.objects.select_related('student')[:5],
-        'offices': Office.objects.annotate(
-            staff_count=Count('staff'),
-            pending_requests=Count('clearance_requests', filter=Q(clearance_requests__status='pending'))
-        ),
+        **get_admin_dashboard_statistics(),
+        'recent_clearances': Clearance.objects.select_related('student__user')[:5],
         'pending_approvals': pending_approvals,
     }
     return render(request, 'admin/dashboard.html', context)
@@ -372,11 +423,7 @@ def admin_clearances(request):
     clearances = Clearance.objects.select_related('student').all().order_by('-school_year', '-semester')
     
     # Get clearance statistics
-    clearance_stats = {
-        'pending': ClearanceRequest.objects.filter(status='PENDING').count(),
-        'approved': ClearanceRequest.objects.filter(status='APPROVED').count(),
-        'denied': ClearanceRequest.objects.filter(status='DENIED').count(),
-    }
+    clearance_stats = get_admin_dashboard_statistics()['clearance_stats']
     
     # Get recent clearances
     recent_clearances = Clearance.objects.select_related('student').order_by('-created_at')[:5]
@@ -494,44 +541,72 @@ def create_user(request):
             messages.error(request, f'Error creating user: {str(e)}')
             return redirect('create_user')
 
+    reference_data = get_reference_data()
     context = {
-        'courses': Course.objects.all(),
-        'offices': Office.objects.all(),
-        'program_chairs': ProgramChair.objects.all(),
-        'deans': Dean.objects.all(),
+        'courses': reference_data['courses'],
+        'offices': reference_data['offices'],
+        'program_chairs': reference_data['program_chairs'],
+        'deans': reference_data['deans'],
     }
     return render(request, 'admin/create_user.html', context)
 
+def reference_etag(request, dean_id):
+    """ETag of the reference JSON endpoints, see core.reference."""
+    return f"{get_reference_version()}-{dean_id}"
+
 @login_required
+@condition(etag_func=reference_etag)
 def get_program_chairs(request, dean_id):
-    program_chairs = ProgramChair.objects.filter(dean_id=dean_id).select_related('user')
     data = [{
         'id': pc.id,
         'user': {
             'full_name': f"{pc.user.first_name} {pc.user.last_name}"
         }
-    } for pc in program_chairs]
+    } for pc in get_reference_data()['program_chairs'] if pc.dean_id == dean_id]
     return JsonResponse(data, safe=False)
 
 @login_required
+@condition(etag_func=reference_etag)
 def get_courses(request, dean_id):
-    courses = Course.objects.filter(dean_id=dean_id)
     data = [{
         'id': course.id,
         'code': course.code
-    } for course in courses]
+    } for course in get_reference_data()['courses'] if course.dean_id == dean_id]
     return JsonResponse(data, safe=False)
 
 @login_required
+@condition(etag_func=reference_etag)
 def get_offices(request, dean_id):
-    offices = Office.objects.filter(affiliated_dean_id=dean_id)
     data = [{
         'id': office.id,
         'name': office.name
-    } for office in offices]
+    } for office in get_reference_data()['offices'] if office.affiliated_dean_id == dean_id]
     return JsonResponse(data, safe=False)
 def is_program_chair(user):
-    return hasattr(user, 'programchair')
+    return get_user_role(user) == ROLE_PROGRAM_CHAIR
+
+def get_program_chair_statistics(dean, school_year, semester):
+    """
+    Returns the total, cleared and pending student counts of a dean for a
+    semester, computed in one query and cached until the dean's students or
+    the semester's clearances change.
+    """
+    def compute_stats():
+        return Student.objects.filter(course__dean=dean).annotate(
+            term_clearance=FilteredRelation(
+                'clearances',
+                condition=Q(clearances__school_year=school_year, clearances__semester=semester)
+            )
+        ).aggregate(
+            total_students=Count('pk'),
+            cleared_students=Count('term_clearance', filter=Q(term_clearance__is_cleared=True)),
+            pending_clearances=Count('term_clearance', filter=Q(term_clearance__is_cleared=False)),
+        )
+
+    return get_or_set(
+        'program_chair_stats', [dean_scope(dean.pk if dean else None), term_scope(school_year, semester)],
+        compute_stats, PROGRAM_CHAIR_STATS_TIMEOUT
+    )
 
 @login_required
 @user_passes_test(is_program_chair)
@@ -539,43 +614,132 @@ def program_chair_dashboard(request):
     program_chair = request.user.programchair
     students = Student.objects.filter(course__dean=program_chair.dean)
     
-    # Get current school year and semester
-    current_year = timezone.now().year
-    school_year = f"{current_year}-{current_year + 1}"
-    semester = "1ST"  # You might want to make this dynamic
+    # Get the selected school year and semester, defaulting to the current one
+    current_school_year, current_semester = get_current_term()
+    school_year = request.GET.get('school_year') or current_school_year
+    semester = request.GET.get('semester')
+    if semester not in dict(SEMESTER_CHOICES):
+        semester = current_semester
     
     # Count statistics
-    total_students = students.count()
-    cleared_students = students.filter(
-        clearances__is_cleared=True,  # Changed from clearance to clearances
-        clearances__school_year=school_year,
-        clearances__semester=semester
-    ).count()
-    
-    pending_clearances = students.filter(
-        clearances__is_cleared=False,
-        clearances__school_year=school_year,
-        clearances__semester=semester
-    ).count()
+    stats = get_program_chair_statistics(program_chair.dean, school_year, semester)
     
+    # Join each student's clearance of the selected term, at most one, so the
+    # template does not query clearances per student
+    students_list = students.select_related('user', 'course').annotate(
+        term_clearance=FilteredRelation(
+            'clearances',
+            condition=Q(clearances__school_year=school_year, clearances__semester=semester)
+        ),
+        term_clearance_id=F('term_clearance__id'),
+        term_clearance_is_cleared=F('term_clearance__is_cleared'),
+    ).order_by('student_id')
+
     # Get students with pagination
-    paginator = Paginator(students, 10)  # Show 10 students per page
+    paginator = Paginator(students_list, 10)  # Show 10 students per page
     page = request.GET.get('page')
     students_page = paginator.get_page(page)
     
     context = {
         'program_chair': program_chair,
         'students': students_page,
-        'total_students': total_students,
-        'cleared_students': cleared_students,
-        'pending_clearances': pending_clearances,
+        'total_students': stats['total_students'],
+        'cleared_students': stats['cleared_students'],
+        'pending_clearances': stats['pending_clearances'],
         'school_year': school_year,
         'semester': semester,
+        'school_years': get_school_years(),
+        'semesters': SEMESTER_CHOICES,
         'page_obj': students_page,  # For pagination
     }
     return render(request, 'core/program_chair_dashboard.html', context)
 
 @login_required
+@user_passes_test(is_program_chair)
+@require_POST
+def unlock_permits(request):
+    """Unlocks the permits of every cleared student of the program chair's dean for a semester."""
+    program_chair = request.user.programchair
+    school_year = request.POST.get('school_year')
+    semester = request.POST.get('semester')
+    if not school_year or semester not in dict(SEMESTER_CHOICES):
+        return JsonResponse({'error': 'Invalid school year or semester'}, status=400)
+
+    result = Clearance.unlock_permits(
+        Clearance.objects.filter(
+            student__course__dean=program_chair.dean,
+            school_year=school_year,
+            semester=semester
+        ),
+        unlocked_by=request.user
+    )
+
+    if 'application/json' in request.headers.get('Accept', ''):
+        return JsonResponse(result)
+
+    messages.success(
+        request,
+        f"Unlocked {result['unlocked']} permits ({result['already_unlocked']} already unlocked, "
+        f"{result['not_cleared']} students not yet cleared)"
+    )
+    query = urlencode({'school_year': school_year, 'semester': semester})
+    return redirect(f"{reverse('program_chair_dashboard')}?{query}")
+
+@login_required
+@user_passes_test(is_program_chair)
+def print_permit(request, clearance_id):
+    program_chair = request.user.programchair
+    clearance = get_object_or_404(
+        Clearance.objects.select_related('student__user', 'student__course__dean', 'student__program_chair__user'),
+        pk=clearance_id,
+        student__course__dean=program_chair.dean
+    )
+    if not clearance.is_cleared:
+        messages.error(request, 'This student has not been cleared yet')
+        return redirect('program_chair_dashboard')
+
+    return render(request, 'core/print_permit.html', {
+        'clearance': clearance,
+        'student': clearance.student,
+        'dean': clearance.student.course.dean,
+        'logo_url': PERMIT_DEFAULT_LOGO,
+    })
+
+@login_required
+@user_passes_test(is_program_chair)
+def print_permits(request):
+    """Downloads every unlocked permit of the program chair's dean for a semester as one PDF."""
+    program_chair = request.user.programchair
+    current_school_year, current_semester = get_current_term()
+    school_year = request.GET.get('school_year') or current_school_year
+    semester = request.GET.get('semester')
+    if semester not in dict(SEMESTER_CHOICES):
+        semester = current_semester
+
+    clearances = Clearance.objects.filter(
+        student__course__dean=program_chair.dean,
+        school_year=school_year,
+        semester=semester,
+        program_chair_approved=True
+    )
+    if not clearances.exists():
+        messages.error(request, 'No unlocked permits found for the selected semester')
+        query = urlencode({'school_year': school_year, 'semester': semester})
+        return redirect(f"{reverse('program_chair_dashboard')}?{query}")
+
+    output = tempfile.TemporaryFile()
+    generate_permits_pdf(output, clearances)
+    output.seek(0)
+    return FileResponse(output, as_attachment=True, filename=f"permits_{school_year}_{semester}.pdf")
+
+# Roles that may queue and download the school-wide clearance reports
+REPORT_ROLES = (ROLE_PROGRAM_CHAIR, ROLE_STAFF, ROLE_ADMIN)
+
+def can_use_reports(user):
+    return get_user_role(user) in REPORT_ROLES
+
+@login_required
+@user_passes_test(can_use_reports)
 def generate_reports(request):
     if request.method == 'POST':
         # Handle report generation logic here
@@ -584,58 +748,83 @@ def generate_reports(request):
     context = {
         'school_years': get_school_years(),
         'semesters': SEMESTER_CHOICES,
+        # Shared, a job queued by someone else may be the one reused for this user
+        'report_jobs': ReportJob.objects.all()[:10],
     }
     return render(request, 'core/generate_reports.html', context)
 
 @login_required
+@user_passes_test(can_use_reports)
 def generate_report(request):
+    """
+    Queues a report job, built in the background by run_report_worker.
+    Identical reports over unchanged data reuse the existing job.
+    """
     if request.method == 'POST':
         school_year = request.POST.get('school_year')
         semester = request.POST.get('semester')
         report_type = request.POST.get('report_type')
-        
-        # Add your report generation logic here
-        if report_type == 'pdf':
-            # Generate PDF report
-            response = HttpResponse(content_type='application/pdf')
-            response['Content-Disposition'] = f'attachment; filename="clearance_report_{school_year}_{semester}.pdf"'
-            # Add PDF generation logic here
-            return response
-            
-        elif report_type == 'excel':
-            # Generate Excel report
-            response = HttpResponse(content_type='application/vnd.ms-excel')
-            response['Content-Disposition'] = f'attachment; filename="clearance_report_{school_year}_{semester}.xlsx"'
-            # Add Excel generation logic here
-            return response
-            
-        messages.success(request, 'Report generated successfully')
+
+        if report_type not in dict(ReportJob.REPORT_TYPES) or semester not in dict(SEMESTER_CHOICES) or not school_year:
+            messages.error(request, 'Invalid report parameters')
+            return redirect('generate_reports')
+
+        job = ReportJob.enqueue(school_year, semester, report_type, requested_by=request.user)
+
+        if 'application/json' in request.headers.get('Accept', ''):
+            return JsonResponse(report_job_data(job), status=202)
+
+        if job.status == 'done':
+            messages.success(request, f'Report #{job.pk} is ready for download')
+        else:
+            messages.success(request, f'Report #{job.pk} has been queued')
         
     return redirect('generate_reports')
 
-def get_school_years():
-    current_year = timezone.now().year
-    return [f"{year}-{year + 1}" for year in range(current_year - 2, current_year + 1)]
+def report_job_data(job):
+    data = {
+        'job_id': job.pk,
+        'status': job.status,
+        'status_url': reverse('report_job_status', args=[job.pk]),
+    }
+    if job.status == 'done':
+        data['download_url'] = reverse('download_report', args=[job.pk])
+    elif job.status == 'failed':
+        data['error'] = job.error
+    return data
+
+def get_report_job_for_user(user, job_id):
+    # Reports are school-wide and enqueue() hands one job to everyone asking
+    # for the same report, so every report user may reach every job
+    if not can_use_reports(user):
+        raise Http404
+    return get_object_or_404(ReportJob, pk=job_id)
+
+@login_required
+@user_passes_test(can_use_reports)
+def report_job_status(request, job_id):
+    """API endpoint to poll the status of a report job"""
+    job = get_report_job_for_user(request.user, job_id)
+    return JsonResponse(report_job_data(job))
+
+@login_required
+@user_passes_test(can_use_reports)
+def download_report(request, job_id):
+    job = get_report_job_for_user(request.user, job_id)
+    if job.status != 'done':
+        messages.error(request, 'This report is not ready yet')
+        return redirect('generate_reports')
+    return FileResponse(job.file.open('rb'), as_attachment=True, filename=job.filename)
 
 @login_required
 def create_clearance_requests(request):
-    if not hasattr(request.user, 'student'):
+    if request.role != ROLE_STUDENT:
         messages.error(request, "Access denied. Student profile required.")
         return redirect('home')
     
     try:
         student = request.user.student
-        current_year = timezone.now().year
-        school_year = f"{current_year}-{current_year + 1}"
-        
-        # Determine current semester based on month
-        month = timezone.now().month
-        if 6 <= month <= 10:
-            semester = "1ST"
-        elif month >= 11 or month <= 3:
-            semester = "2ND"
-        else:
-            semester = "SUM"
+        school_year, semester = get_current_term()
         
         # Create clearance requests
         student.create_clearance_requests(school_year=school_year, semester=semester)
@@ -647,6 +836,8 @@ def create_clearance_requests(request):
     return redirect('student_dashboard')
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=student_page_etag)
 def view_clearance_details(request, clearance_id):
     clearance = get_object_or_404(Clearance, id=clearance_id)
     
@@ -677,12 +868,10 @@ def update_profile_picture(request):
             return redirect('home')
 
         # Handle different user types
-        if hasattr(request.user, 'student'):
-            profile = request.user.student
-        elif hasattr(request.user, 'programchair'):
-            profile = request.user.programchair
-        elif request.user.is_superuser:
-            profile, created = UserProfile.objects.get_or_create(user=request.user)
+        if request.role in (ROLE_STUDENT, ROLE_PROGRAM_CHAIR):
+            profile = request.profile
+        elif request.role == ROLE_ADMIN:
+            profile = request.profile or UserProfile.objects.get_or_create(user=request.user)[0]
         else:
             messages.error(request, 'Invalid user type')
             return redirect('home')
@@ -698,9 +887,9 @@ def update_profile_picture(request):
         messages.success(request, 'Profile picture updated successfully')
         
         # Redirect based on user type
-        if hasattr(request.user, 'student'):
+        if request.role == ROLE_STUDENT:
             return redirect('student_profile')
-        elif hasattr(request.user, 'programchair'):
+        elif request.role == ROLE_PROGRAM_CHAIR:
             return redirect('program_chair_profile')
         else:
             return redirect('admin_profile')
@@ -749,31 +938,22 @@ def staff_dashboard(request):
     except Staff.DoesNotExist:
         return redirect('login')
 
-    # Get current semester info
-    current_year = timezone.now().year
-    school_year = f"{current_year}-{current_year + 1}"
-    month = timezone.now().month
-    
-    # Determine current semester based on month
-    if 6 <= month <= 10:
-        current_semester = "1ST"
-    elif month >= 11 or month <= 3:
-        current_semester = "2ND"
-    else:
-        current_semester = "SUM"
+    school_year, current_semester = get_current_term()
 
-    # Get pending requests
-    pending_requests = ClearanceRequest.objects.filter(
-        office=staff.office,
-        status='pending'
+    # Get pending requests of the active term
+    pending_requests = ClearanceRequest.objects.handleable_by(staff).filter(
+        status='pending',
+        school_year=school_year,
+        semester=current_semester
     )
 
-    # Get today's statistics
-    today = timezone.now().date()
+    # Get today's statistics, as a range so the reviewed date index is usable
+    today_start = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
     approved_today_count = ClearanceRequest.objects.filter(
         office=staff.office,
         status='approved',
-        reviewed_date__date=today
+        reviewed_date__gte=today_start,
+        reviewed_date__lt=today_start + timedelta(days=1)
     ).count()
 
     # Get total processed requests
@@ -788,7 +968,6 @@ def staff_dashboard(request):
     ).order_by('-request_date')[:10]
 
     context = {
-        'current_semester': current_semester,
         'pending_requests_count': pending_requests.count(),
         'approved_today_count': approved_today_count,
         'total_processed': total_processed.count(),
@@ -797,44 +976,119 @@ def staff_dashboard(request):
 
     return render(request, 'core/staff_dashboard.html', context)  # Updated template path
 
+def encode_queue_cursor(clearance_request):
+    """Opaque keyset cursor pointing just after a request in (request_date, id) order."""
+    value = f"{clearance_request.request_date.isoformat()}|{clearance_request.pk}"
+    return urlsafe_b64encode(value.encode()).decode()
+
+def decode_queue_cursor(cursor):
+    """Returns the (request_date, id) of a cursor, raises ValueError when it is malformed."""
+    try:
+        request_date, pk = urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(request_date), int(pk)
+    except (TypeError, ValueError):
+        # binascii.Error and UnicodeDecodeError are ValueErrors too
+        raise ValueError("Invalid cursor") from None
+
+def filter_pending_queue(clearance_requests, params):
+    """Applies the year level, course and search filters of the pending queue."""
+    year_level = params.get('year_level')
+    if year_level and year_level.isdigit():
+        clearance_requests = clearance_requests.filter(student__year_level=year_level)
+    course = params.get('course')
+    if course and course.isdigit():
+        clearance_requests = clearance_requests.filter(student__course_id=course)
+    search_query = params.get('search', '').strip()
+    if search_query:
+        clearance_requests = search_students(clearance_requests, search_query)
+    return clearance_requests
+
 @login_required
 def staff_pending_requests(request):
-    """View for staff to manage their pending clearance requests."""
+    """
+    View for staff to manage their pending clearance requests. The queue is
+    keyset paginated on (request_date, id): ?cursor= continues after the last
+    row, ?format=json returns the rows as JSON and ?partial=1 as table rows.
+    """
     try:
         staff = request.user.staff
     except Staff.DoesNotExist:
         return redirect('login')
 
-    # Get current semester info
-    current_year = timezone.now().year
-    school_year = f"{current_year}-{current_year + 1}"
-    month = timezone.now().month
-    
-    # Determine current semester based on month
-    if 6 <= month <= 10:
-        current_semester = "1ST"
-    elif month >= 11 or month <= 3:
-        current_semester = "2ND"
-    else:
-        current_semester = "SUM"
+    school_year, current_semester = get_current_term()
 
-    # Get pending requests for the staff's office
-    pending_requests = ClearanceRequest.objects.filter(
-        office=staff.office,
-        status='pending'
-    ).select_related(
+    # Get pending requests of the active term the staff member can handle
+    pending_requests = filter_pending_queue(
+        ClearanceRequest.objects.handleable_by(staff).filter(
+            status='pending',
+            school_year=school_year,
+            semester=current_semester
+        ),
+        request.GET
+    )
+
+    page = pending_requests.select_related(
         'student',
         'student__user',
         'student__course'
-    ).order_by('-request_date')
+    ).order_by('request_date', 'id')
+    cursor = request.GET.get('cursor')
+    if cursor:
+        try:
+            after_date, after_id = decode_queue_cursor(cursor)
+        except ValueError as e:
+            if request.GET.get('format') == 'json':
+                return JsonResponse({'error': str(e)}, status=400)
+            if request.GET.get('partial'):
+                return HttpResponseBadRequest(str(e))
+            # Start the queue over with the same filters
+            messages.error(request, f"{e}, showing the queue from the start.")
+            params = request.GET.copy()
+            del params['cursor']
+            return redirect(f"{reverse('staff_pending_requests')}?{params.urlencode()}")
+        page = page.filter(
+            Q(request_date__gt=after_date) | Q(request_date=after_date, id__gt=after_id)
+        )
+
+    # One extra row tells whether there is a next page without counting
+    rows = list(page[:PENDING_QUEUE_PAGE_SIZE + 1])
+    next_cursor = None
+    if len(rows) > PENDING_QUEUE_PAGE_SIZE:
+        rows = rows[:PENDING_QUEUE_PAGE_SIZE]
+        next_cursor = encode_queue_cursor(rows[-1])
+
+    if request.GET.get('format') == 'json':
+        return JsonResponse({
+            'results': [{
+                'id': clearance_request.pk,
+                'student_id': clearance_request.student.student_id,
+                'student_name': clearance_request.student.full_name,
+                'course': clearance_request.student.course.code,
+                'year_level': clearance_request.student.year_level,
+                'request_date': clearance_request.request_date.isoformat(),
+            } for clearance_request in rows],
+            'next_cursor': next_cursor,
+        })
 
     context = {
-        'pending_requests': pending_requests,
+        'pending_requests': rows,
+        'next_cursor': next_cursor,
         'current_semester': current_semester,
         'school_year': school_year,
         'office': staff.office
     }
+    if request.GET.get('partial'):
+        return render(request, 'components/pending_request_rows.html', context)
 
+    context.update({
+        'pending_count': pending_requests.count(),
+        'courses': Course.objects.filter(is_active=True).only('id', 'code'),
+        'current_filters': {
+            'year_level': request.GET.get('year_level', ''),
+            'course': request.GET.get('course', ''),
+            'search': request.GET.get('search', ''),
+        },
+    })
     return render(request, 'core/staff_pending_requests.html', context)  # Updated template path
 @login_required
 @require_POST
@@ -857,17 +1111,9 @@ def approve_clearance_request(request, request_id):
             messages.error(request, 'This request has already been processed')
             return redirect(request.META.get('HTTP_REFERER', 'staff_dashboard'))
         
-        # Approve the request
+        # Approve the request (also updates the student's clearance status)
         clearance_request.approve(staff)
         
-        # Update the student's overall clearance status
-        clearance = Clearance.objects.get(
-            student=clearance_request.student,
-            school_year=clearance_request.school_year,
-            semester=clearance_request.semester
-        )
-        clearance.check_clearance()
-        
         messages.success(
             request,
             f'Successfully approved clearance request for {clearance_request.student.full_name}'
@@ -908,17 +1154,9 @@ def deny_clearance_request(request, request_id):
             messages.error(request, 'A reason must be provided for denial')
             return redirect(request.META.get('HTTP_REFERER', 'staff_dashboard'))
         
-        # Deny the request
+        # Deny the request (also updates the student's clearance counters)
         clearance_request.deny(staff, reason)
         
-        # Update the student's overall clearance status
-        clearance = Clearance.objects.get(
-            student=clearance_request.student,
-            school_year=clearance_request.school_year,
-            semester=clearance_request.semester
-        )
-        clearance.check_clearance()
-        
         messages.success(
             request,
             f'Successfully denied clearance request for {clearance_request.student.full_name}'
@@ -931,6 +1169,54 @@ def deny_clearance_request(request, request_id):
     
     return redirect(request.META.get('HTTP_REFERER', 'staff_dashboard'))
 
+@login_required
+@require_POST
+def bulk_review_clearance_requests(request):
+    """
+    Approve or deny many clearance requests at once. Accepts either a list of
+    request_ids or select=all for every pending request of the staff member's
+    office in the current term, optionally narrowed by the year_level, course
+    and search filters of the pending queue. Returns per-item results.
+    """
+    try:
+        staff = request.user.staff
+    except Staff.DoesNotExist:
+        return JsonResponse({'error': 'Staff access required'}, status=403)
+
+    action = request.POST.get('action')
+    if action not in ('approve', 'deny'):
+        return JsonResponse({'error': 'Invalid action specified'}, status=400)
+    reason = request.POST.get('reason', '')
+    if action == 'deny' and not reason:
+        return JsonResponse({'error': 'A reason must be provided for denial'}, status=400)
+
+    try:
+        request_ids = [int(request_id) for request_id in request.POST.getlist('request_ids')]
+    except ValueError:
+        return JsonResponse({'error': 'Invalid request id'}, status=400)
+
+    if request_ids:
+        clearance_requests = ClearanceRequest.objects.filter(pk__in=request_ids)
+    elif request.POST.get('select') == 'all':
+        school_year, semester = get_current_term()
+        clearance_requests = ClearanceRequest.objects.filter(
+            office=staff.office, status='pending', school_year=school_year, semester=semester
+        )
+        clearance_requests = filter_pending_queue(clearance_requests, request.POST)
+    else:
+        return JsonResponse({'error': 'No clearance requests selected'}, status=400)
+
+    status = 'approved' if action == 'approve' else 'denied'
+    outcomes = ClearanceRequest.bulk_review(staff, clearance_requests, status, reason)
+    for request_id in request_ids:
+        outcomes.setdefault(request_id, 'not_found')
+
+    return JsonResponse({
+        'processed': sum(1 for outcome in outcomes.values() if outcome == status),
+        'skipped': sum(1 for outcome in outcomes.values() if outcome != status),
+        'results': [{'id': pk, 'result': outcome} for pk, outcome in outcomes.items()],
+    })
+
 @login_required
 def staff_clearance_history(request):
     """View for staff to see history of processed clearance requests."""
@@ -946,8 +1232,7 @@ def staff_clearance_history(request):
     search_query = request.GET.get('search', '')
 
     # Base queryset
-    clearance_requests = ClearanceRequest.objects.filter(
-        office=staff.office,
+    clearance_requests = ClearanceRequest.objects.handleable_by(staff).filter(
         status__in=['approved', 'denied']
     ).select_related(
         'student',
@@ -964,25 +1249,17 @@ def staff_clearance_history(request):
     if semester:
         clearance_requests = clearance_requests.filter(semester=semester)
     if search_query:
-        clearance_requests = clearance_requests.filter(
-            Q(student__student_id__icontains=search_query) |
-            Q(student__user__first_name__icontains=search_query) |
-            Q(student__user__last_name__icontains=search_query)
-        )
+        clearance_requests = search_students(clearance_requests, search_query)
 
-    # Get unique school years for filter dropdown
-    school_years = ClearanceRequest.objects.filter(
-        office=staff.office
-    ).values_list('school_year', flat=True).distinct()
-
-    # Pagination
-    paginator = Paginator(clearance_requests, 20)  # 20 items per page
+    # Pagination, the count stops at ESTIMATED_COUNT_LIMIT rows
+    paginator = EstimatedCountPaginator(clearance_requests, 20)  # 20 items per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     context = {
         'page_obj': page_obj,
-        'school_years': school_years,
+        'page_range': paginator.get_elided_page_range(page_obj.number),
+        'school_years': get_school_years(),
         'current_filters': {
             'status': status,
             'school_year': school_year,
@@ -1048,7 +1325,8 @@ def view_request(request, request_id):
     )
 
     # Check if staff member can handle this request
-    if not clearance_request.can_be_handled_by(staff):
+    can_handle = clearance_request.can_be_handled_by(staff)
+    if not can_handle:
         messages.error(request, "You don't have permission to view this request.")
         return redirect('staff_pending_requests')
 
@@ -1080,7 +1358,7 @@ def view_request(request, request_id):
         'clearance_request': clearance_request,
         'student': clearance_request.student,
         'office': staff.office,
-        'can_handle': clearance_request.can_be_handled_by(staff)
+        'can_handle': can_handle
     }
 
     return render(request, 'staff/view_request.html', context)
@@ -1135,64 +1413,13 @@ def reject_registration(request, user_id):
     except Student.DoesNotExist:
         return JsonResponse({'error': 'Student not found'}, status=404)
 
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
+@login_required
+@user_passes_test(lambda u: u.is_superuser)
+def profiling_stats(request):
+    """Per-view timings and query counts of the sampled requests, POST clears them."""
+    if request.method == 'POST':
+        profile_store.clear()
+    return JsonResponse({
+        'sample_rate': getattr(settings, 'PROFILING_SAMPLE_RATE', 0),
+        'views': profile_store.summary(),
+    })